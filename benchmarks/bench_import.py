@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Benchmarks for jasypt4py cold start, the import time and first use cost seen by short-lived processes.
+
+Each case runs in a fresh interpreter and reports the median time of the case statement alone, timed inside the
+interpreter so its own start-up is not counted, together with the modules the case pulled in. Pass --baseline to
+compare against a previous run and exit non zero when a case slowed down by more than --threshold.
+
+    python benchmarks/bench_import.py --output baseline.json
+    python benchmarks/bench_import.py --baseline baseline.json
+"""
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+CASES = [
+    ('import', 'import jasypt4py'),
+    ('import_encryptor', 'from jasypt4py import StandardPBEStringEncryptor'),
+    ('first_encrypt', 'from jasypt4py import StandardPBEStringEncryptor\n'
+                      'StandardPBEStringEncryptor("PBEWITHSHA256AND256BITAES-CBC").encrypt("password", "value", 1000)'),
+    ('first_decrypt_many', 'from jasypt4py import StandardPBEStringEncryptor\n'
+                           'StandardPBEStringEncryptor("PBEWITHSHA256AND256BITAES-CBC").decrypt_many('
+                           '"password", [], 1000)'),
+]
+
+# runs the case and prints its wall time and the modules it imported
+PROBE = '''
+import sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+exec(compile(sys.argv[1], '<case>', 'exec'))
+elapsed = time.perf_counter() - started
+print(elapsed)
+print(' '.join(sorted(m.split('.')[0] for m in set(sys.modules) - before if not m.startswith('jasypt4py'))))
+'''
+
+
+def measure(statement, runs):
+    """
+    Run a statement in fresh interpreters.
+
+    :return: dict with the median seconds and the top level packages it imported
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='')
+    samples, modules = [], ''
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', PROBE, statement], env=env, cwd=ROOT)
+        lines = output.decode('utf-8').splitlines()
+        samples.append(float(lines[0]))
+        modules = lines[1] if len(lines) > 1 else ''
+    samples.sort()
+    return {'runs': runs, 'seconds': samples[len(samples) // 2], 'min': samples[0],
+            'modules': sorted(set(modules.split()))}
+
+
+def run(runs):
+    results = []
+    for name, statement in CASES:
+        result = {'case': name}
+        result.update(measure(statement, runs))
+        results.append(result)
+        print('%-20s %8.1f ms  %s' % (name, result['seconds'] * 1000, ' '.join(result['modules'])), file=sys.stderr)
+    return {
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    :return: list of cases that took more than threshold longer than in the baseline
+    """
+    previous = dict((r['case'], r) for r in baseline['results'])
+    regressions = []
+    for result in report['results']:
+        before = previous.get(result['case'])
+        if before is None:
+            continue
+        result['change'] = result['seconds'] / before['seconds'] - 1
+        if result['change'] > threshold:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', help='JSON report of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slow down that counts as a regression (default 0.25)')
+    parser.add_argument('--runs', type=int, default=11, help='fresh interpreters per case')
+    args = parser.parse_args(argv)
+
+    report = run(args.runs)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report['regressions'] = [r['case'] for r in regressions]
+        for r in regressions:
+            print('REGRESSION %s: +%.1f%%' % (r['case'], r['change'] * 100), file=sys.stderr)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
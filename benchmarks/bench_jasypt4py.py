@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+Benchmarks for jasypt4py key derivation and encrypt/decrypt throughput.
+
+Writes machine readable JSON with ops/sec, p50/p99 latency and peak memory per case. Pass --baseline to compare
+against a previous run and exit non zero when a case regressed by more than --threshold.
+
+    python benchmarks/bench_jasypt4py.py --output baseline.json
+    python benchmarks/bench_jasypt4py.py --baseline baseline.json
+"""
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from jasypt4py.algorithm import ALGORITHMS as REGISTERED_ALGORITHMS  # noqa: E402
+from jasypt4py.backend import BACKENDS  # noqa: E402
+from jasypt4py.encryptor import StandardPBEStringEncryptor  # noqa: E402
+from jasypt4py.generator import PKCS12ParameterGenerator  # noqa: E402
+
+ALGORITHMS = sorted(REGISTERED_ALGORITHMS)
+THREADED_ALGORITHM = 'PBEWITHSHA256AND256BITAES-CBC'
+ITERATIONS = [1, 1000, 10000, 100000]
+PAYLOAD_SIZES = [16, 1024, 64 * 1024, 1024 * 1024]
+QUICK_ITERATIONS = [1, 1000]
+QUICK_PAYLOAD_SIZES = [16, 1024]
+THREADS = [1, 2, 4, 8]
+THREADED_PAYLOAD_SIZE = 64 * 1024
+THREADED_OPS = 64
+
+PASSWORD = 'pssst...don\'t tell anyone'
+SALT = bytearray(b'0123456789ABCDEF')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def measure(func, min_time, min_runs):
+    """
+    Run func repeatedly for at least min_time seconds and min_runs runs.
+
+    :return: dict with ops/sec, p50/p99 latency in seconds and peak traced memory in bytes
+    """
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or time.perf_counter() - started < min_time:
+        t = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t)
+
+    return {
+        'runs': len(samples),
+        'ops_per_sec': len(samples) / sum(samples),
+        'p50': percentile(samples, 50),
+        'p99': percentile(samples, 99),
+        'peak_memory': peak,
+    }
+
+
+def cases(iterations, payload_sizes):
+    for algorithm in ALGORITHMS:
+        encryptor = StandardPBEStringEncryptor(algorithm)
+        generator = encryptor.key_generator
+        password_bytes = PKCS12ParameterGenerator.pkcs12_password_to_bytes(PASSWORD)
+        key_size = generator.key_size_bits // 8
+
+        for n in iterations:
+            # the single material derivation only exists for PKCS12, PBKDF2 derives key and iv in one call
+            if hasattr(generator, 'generate_derived_key'):
+                yield ('generate_derived_key', algorithm, n, 0), \
+                    (lambda g=generator, n=n: g.generate_derived_key(password_bytes, SALT, n, g.KEY_MATERIAL,
+                                                                     key_size))
+            yield ('generate_derived_parameters', algorithm, n, 0), \
+                (lambda g=generator, n=n: g.generate_derived_parameters(PASSWORD, SALT, n))
+
+        for size in payload_sizes:
+            text = 'x' * size
+            ciphertext = encryptor.encrypt(PASSWORD, text, iterations[0])
+            yield ('encrypt', algorithm, iterations[0], size), \
+                (lambda e=encryptor, t=text: e.encrypt(PASSWORD, t, iterations[0]))
+            yield ('decrypt', algorithm, iterations[0], size), \
+                (lambda e=encryptor, c=ciphertext: e.decrypt(PASSWORD, c, iterations[0]))
+
+
+def measure_threads(encryptor, threads, ops):
+    """
+    Decrypt ops values split over threads sharing one encryptor.
+
+    :return: dict with the aggregate ops/sec
+    """
+    ciphertext = encryptor.encrypt(PASSWORD, 'x' * THREADED_PAYLOAD_SIZE, 1)
+    per_thread = max(ops // threads, 1)
+
+    def work():
+        for _ in range(per_thread):
+            encryptor.decrypt(PASSWORD, ciphertext, 1)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return {'runs': per_thread * threads, 'ops_per_sec': per_thread * threads / (time.perf_counter() - started)}
+
+
+def run(iterations, payload_sizes, min_time, min_runs, threads):
+    results = []
+    for (operation, algorithm, n, size), func in cases(iterations, payload_sizes):
+        result = {'operation': operation, 'algorithm': algorithm, 'iterations': n, 'payload_size': size}
+        result.update(measure(func, min_time, min_runs))
+        results.append(result)
+        print('%-28s %-30s iter=%-6d size=%-8d %12.1f ops/s' % (operation, algorithm, n, size,
+                                                                result['ops_per_sec']), file=sys.stderr)
+
+    # shared encryptor throughput, scales with threads where the backend releases the GIL
+    for backend in [b.name for b in BACKENDS if b.ciphers and b.available()]:
+        encryptor = StandardPBEStringEncryptor(THREADED_ALGORITHM, backend=backend)
+        for n in threads:
+            result = {'operation': 'decrypt_threads', 'algorithm': THREADED_ALGORITHM, 'backend': backend,
+                      'threads': n, 'iterations': 1, 'payload_size': THREADED_PAYLOAD_SIZE}
+            result.update(measure_threads(encryptor, n, THREADED_OPS))
+            results.append(result)
+            print('%-28s %-30s threads=%-3d %12.1f ops/s' % ('decrypt_threads', backend, n, result['ops_per_sec']),
+                  file=sys.stderr)
+    return {
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def case_key(result):
+    return (result['operation'], result['algorithm'], result['iterations'], result['payload_size'],
+            result.get('backend', ''), result.get('threads', 1))
+
+
+def compare(report, baseline, threshold):
+    """
+    Compare ops/sec of each case with the baseline.
+
+    :return: list of regressed cases with their relative change
+    """
+    previous = dict((case_key(r), r) for r in baseline['results'])
+    regressions = []
+    for result in report['results']:
+        before = previous.get(case_key(result))
+        if before is None:
+            continue
+        change = result['ops_per_sec'] / before['ops_per_sec'] - 1
+        result['baseline_ops_per_sec'] = before['ops_per_sec']
+        result['change'] = change
+        if change < -threshold:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', help='JSON report of a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative ops/sec drop that counts as a regression (default 0.1)')
+    parser.add_argument('--quick', action='store_true', help='only small iteration counts and payloads')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per case')
+    parser.add_argument('--min-runs', type=int, default=5, help='minimum runs per case')
+    parser.add_argument('--threads', type=int, nargs='+', default=THREADS,
+                        help='thread counts for the shared encryptor case (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    report = run(QUICK_ITERATIONS if args.quick else ITERATIONS,
+                 QUICK_PAYLOAD_SIZES if args.quick else PAYLOAD_SIZES,
+                 args.min_time, args.min_runs, args.threads)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report['regressions'] = [case_key(r) for r in regressions]
+        for r in regressions:
+            print('REGRESSION %s %s iter=%d size=%d %s threads=%d: %.1f%%' % (case_key(r) + (r['change'] * 100,)),
+                  file=sys.stderr)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
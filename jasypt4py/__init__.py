@@ -1,6 +1,42 @@
 # Make coding more python3-ish
 from __future__ import (absolute_import, division, print_function)
 
-from jasypt4py.encryptor import StandardPBEStringEncryptor
+import importlib
+import sys
+
+# public names and the module defining them, imported on first access so that importing the package stays cheap
+_EXPORTS = {
+    'PBEAlgorithm': 'jasypt4py.algorithm',
+    'register_algorithm': 'jasypt4py.algorithm',
+    'PBEBulkDecryptor': 'jasypt4py.bulk',
+    'DerivedKeyCache': 'jasypt4py.cache',
+    'ConfigResolver': 'jasypt4py.config',
+    'StandardPBEStringEncryptor': 'jasypt4py.encryptor',
+    'PreparedPassword': 'jasypt4py.generator',
+    'MetricsCollector': 'jasypt4py.metrics',
+    'PBEStreamEncryptor': 'jasypt4py.stream',
+}
+
+__all__ = sorted(_EXPORTS)
 
 __metaclass__ = type
+
+
+def _load(name):
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name not in _EXPORTS:
+            raise AttributeError('module %r has no attribute %r' % (__name__, name))
+        return _load(name)
+
+    def __dir__():
+        return sorted(set(globals()) | set(_EXPORTS))
+else:
+    # no module __getattr__ before python 3.7 (PEP 562)
+    for _name in _EXPORTS:
+        _load(_name)
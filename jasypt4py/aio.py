@@ -0,0 +1,115 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import asyncio
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+from jasypt4py.encryptor import BatchResult, StandardPBEStringEncryptor
+from jasypt4py.exceptions import ArgumentError
+
+
+class AsyncPBEStringEncryptor(object):
+    """
+    asyncio counterpart of StandardPBEStringEncryptor.
+
+    Runs encryption and decryption on a bounded process pool so key derivation, which holds the GIL with the
+    hashlib digests, does not stall the event loop. A thread pool can be supplied instead, it avoids the
+    inter-process overhead but delays the loop by up to one digest call per running derivation. Concurrent decrypt
+    calls for the same cipher text share a single in-flight derivation.
+    """
+
+    DEFAULT_CONCURRENCY = 4
+
+    def __init__(self, algorithm, concurrency=DEFAULT_CONCURRENCY, executor=None, **kwargs):
+        """
+
+        :param algorithm: str - the Jasypt algorithm name
+        :param concurrency: int - number of worker processes unless an executor is supplied, and the number of
+            values per worker iter_encrypt and iter_decrypt keep in flight
+        :param executor: concurrent.futures.Executor - optional executor to run derivation on
+        :param kwargs: additional arguments passed to StandardPBEStringEncryptor
+        """
+        if concurrency < 1:
+            raise ArgumentError('concurrency must be a positive number')
+        self.encryptor = StandardPBEStringEncryptor(algorithm, **kwargs)
+        self.concurrency = concurrency
+        self._own_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(max_workers=concurrency)
+        # process workers rebuild the encryptor, threads share it
+        self._processes = isinstance(self._executor, ProcessPoolExecutor)
+        self._in_flight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Shut down the executor if it was created by this instance.
+        """
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    async def _run(self, method, password, value, iterations):
+        loop = asyncio.get_running_loop()
+        if not self._processes:
+            return await loop.run_in_executor(self._executor, getattr(self.encryptor, method), password, value,
+                                              iterations)
+
+        call = self.encryptor._worker_call(method, password, [[value]], iterations)
+        outcome = await loop.run_in_executor(self._executor, call[0], *[args[0] for args in call[1:]])
+        result = self.encryptor._merge_worker(outcome)[0]
+        if result.error is not None:
+            raise result.error
+        return result.value
+
+    async def encrypt(self, password, text, iterations=1000):
+        return await self._run('encrypt', password, text, iterations)
+
+    async def decrypt(self, password, ciphertext, iterations=1000):
+        key = (password, ciphertext, iterations)
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run('decrypt', password, ciphertext, iterations))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._in_flight.pop(key, None))
+        # shield so one cancelled waiter does not cancel the shared derivation
+        return await asyncio.shield(future)
+
+    async def iter_encrypt(self, password, values, iterations=1000):
+        """
+        Encrypt values concurrently, yielding a BatchResult per value in input order.
+        """
+        async for result in self._iter(self.encrypt, password, values, iterations):
+            yield result
+
+    async def iter_decrypt(self, password, values, iterations=1000):
+        """
+        Decrypt values concurrently, yielding a BatchResult per value in input order.
+        """
+        async for result in self._iter(self.decrypt, password, values, iterations):
+            yield result
+
+    async def _iter(self, func, password, values, iterations):
+        # a window of tasks ahead of the consumer keeps the executor busy without a task per input
+        window = 2 * self.concurrency
+        tasks = collections.deque()
+        values = iter(values)
+        try:
+            while True:
+                for value in values:
+                    tasks.append(asyncio.ensure_future(func(password, value, iterations)))
+                    if len(tasks) >= window:
+                        break
+                if not tasks:
+                    return
+                try:
+                    yield BatchResult(await tasks.popleft(), None)
+                except Exception as e:
+                    yield BatchResult(None, e)
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,124 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+from jasypt4py.backend import MODE_CBC
+from jasypt4py.exceptions import ArgumentError
+from jasypt4py.generator import PKCS12ParameterGenerator, PBKDF2ParameterGenerator
+
+# cipher text layouts, the iv is either derived from the password or stored in plain after the salt
+LAYOUT_SALT = 'salt+ciphertext'
+LAYOUT_SALT_IV = 'salt+iv+ciphertext'
+
+
+def pkcs12_derivation(algorithm, backend):
+    """
+    Key and iv derivation of the Jasypt PBEWITHSHA256AND*BITAES-CBC algorithms.
+    """
+    return PKCS12ParameterGenerator(backend.digest(algorithm.digest), algorithm.key_size_bits, algorithm.iv_size_bits)
+
+
+def pbkdf2_derivation(algorithm, backend):
+    """
+    Key derivation of the Jasypt PBEWITHHMACSHA*ANDAES_* algorithms, the iv comes from an iv generator.
+    """
+    return PBKDF2ParameterGenerator(algorithm.digest, algorithm.key_size_bits)
+
+
+class PBEAlgorithm(object):
+    """
+    Immutable description of a password based encryption algorithm, shared by all encryptors using it.
+    """
+    __slots__ = ('name', 'digest', 'key_size_bits', 'iv_size_bits', 'mode', 'derivation', 'layout', '_generators')
+
+    def __init__(self, name, digest, key_size_bits, iv_size_bits=128, mode=MODE_CBC, derivation=pkcs12_derivation,
+                 layout=LAYOUT_SALT):
+        """
+
+        :param name: str - the algorithm name as used by Jasypt (e.g. PBEWITHSHA256AND256BITAES-CBC)
+        :param digest: str - the digest name (e.g. sha256)
+        :param key_size_bits: int - cipher key size in bits
+        :param iv_size_bits: int - iv size in bits
+        :param mode: str - the block cipher mode
+        :param derivation: callable - builds the key generator from this algorithm and a CryptoBackend
+        :param layout: str - LAYOUT_SALT for a derived iv, LAYOUT_SALT_IV for a plain iv after the salt
+        """
+        if layout not in (LAYOUT_SALT, LAYOUT_SALT_IV):
+            raise ArgumentError('Unknown cipher text layout %s' % layout)
+        for slot, value in (('name', name), ('digest', digest), ('key_size_bits', key_size_bits),
+                            ('iv_size_bits', iv_size_bits), ('mode', mode), ('derivation', derivation),
+                            ('layout', layout), ('_generators', {})):
+            object.__setattr__(self, slot, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PBEAlgorithm %s is immutable' % self.name)
+
+    def __reduce__(self):
+        # rebuild through the constructor as __setattr__ rejects the default slot state restore, the shared
+        # generators are not part of the state and are created again on first use
+        return PBEAlgorithm, (self.name, self.digest, self.key_size_bits, self.iv_size_bits, self.mode,
+                              self.derivation, self.layout)
+
+    def __repr__(self):
+        return 'PBEAlgorithm(%r, %r, %d, %d, %r, layout=%r)' % (self.name, self.digest, self.key_size_bits,
+                                                                self.iv_size_bits, self.mode, self.layout)
+
+    def key_generator(self, backend, observer=None):
+        """
+        Get the key generator for a backend, created once and shared unless an observer is attached.
+
+        :param backend: CryptoBackend - provides the digest
+        :param observer: DerivationObserver - optional observer, gives the caller a generator of its own
+        :return: the PBEParameterGenerator
+        """
+        if observer is not None:
+            generator = self.derivation(self, backend)
+            generator.observer = observer
+            return generator
+
+        generator = self._generators.get(backend)
+        if generator is None:
+            generator = self._generators.setdefault(backend, self.derivation(self, backend))
+        return generator
+
+
+ALGORITHMS = {}
+
+
+def register_algorithm(algorithm, replace=False):
+    """
+    Register an algorithm so StandardPBEStringEncryptor accepts its name.
+
+    Worker processes of encrypt_many and decrypt_many see custom algorithms only if they are registered at import
+    time of a module the workers import, or the processes are forked.
+
+    :param algorithm: PBEAlgorithm - the algorithm description
+    :param replace: bool - replace an algorithm registered under the same name
+    :return: the registered PBEAlgorithm
+    """
+    if not replace and algorithm.name in ALGORITHMS:
+        raise ArgumentError('Algorithm %s is already registered' % algorithm.name)
+    ALGORITHMS[algorithm.name] = algorithm
+    return algorithm
+
+
+def get_algorithm(name):
+    """
+    :param name: str - the algorithm name
+    :return: the registered PBEAlgorithm
+    """
+    algorithm = ALGORITHMS.get(name)
+    if algorithm is None:
+        raise NotImplementedError('Algorithm %s is not implemented' % name)
+    return algorithm
+
+
+register_algorithm(PBEAlgorithm('PBEWITHSHA256AND256BITAES-CBC', 'sha256', 256))
+register_algorithm(PBEAlgorithm('PBEWITHSHA256AND128BITAES-CBC', 'sha256', 128))
+
+# Jasypt 1.9.3 PBKDF2 based algorithms, e.g. PBEWITHHMACSHA512ANDAES_256
+for _digest_bits in (1, 224, 256, 384, 512):
+    for _key_bits in (128, 256):
+        register_algorithm(PBEAlgorithm('PBEWITHHMACSHA%dANDAES_%d' % (_digest_bits, _key_bits),
+                                        'sha%d' % _digest_bits, _key_bits,
+                                        derivation=pbkdf2_derivation, layout=LAYOUT_SALT_IV))
+del _digest_bits, _key_bits
@@ -0,0 +1,218 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import hashlib
+import importlib
+import os
+from abc import ABCMeta, abstractmethod
+
+AES_BLOCK_SIZE = 16
+
+MODE_CBC = 'CBC'
+
+# environment variable that overrides backend auto selection
+BACKEND_ENV = 'JASYPT4PY_BACKEND'
+
+
+class HashlibDigestFactory(object):
+    """
+    Adapts a hashlib constructor to the digest factory interface of the Crypto.Hash modules.
+    """
+
+    def __init__(self, name):
+        """
+
+        :param name: str - the hashlib algorithm name (e.g. sha256)
+        """
+        self._constructor = getattr(hashlib, name)
+        digest = self._constructor()
+        self.__name__ = 'hashlib.' + name
+        self.digest_size = digest.digest_size
+        self.block_size = digest.block_size
+
+    def new(self, data=b''):
+        return self._constructor(data)
+
+
+class CryptoBackend(object):
+    """
+    Base for a provider of digests and ciphers.
+    """
+    __metaclass__ = ABCMeta
+
+    name = None
+
+    # False for backends that only provide digests for key derivation
+    ciphers = True
+
+    @classmethod
+    def available(cls):
+        """
+        :return: True if the libraries this backend needs are installed
+        """
+        return True
+
+    def digest(self, name):
+        """
+        Get a digest factory with digest_size, block_size and new(data) as used by PKCS12ParameterGenerator.
+
+        :param name: str - the digest name (e.g. sha256)
+        :return: the digest factory
+        """
+        return HashlibDigestFactory(name)
+
+    @abstractmethod
+    def new_cipher(self, key, mode, iv):
+        """
+        Create an AES cipher.
+
+        :param key: bytes - the cipher key
+        :param mode: str - the block cipher mode, only MODE_CBC is supported
+        :param iv: bytes - the initialization vector
+        :return: a cipher object with incremental encrypt(data) and decrypt(data)
+        """
+        pass
+
+
+class HashlibBackend(CryptoBackend):
+    """
+    Key derivation using hashlib only, it provides no cipher.
+    """
+
+    name = 'hashlib'
+    ciphers = False
+
+    def new_cipher(self, key, mode, iv):
+        raise NotImplementedError('Backend %s does not provide ciphers' % self.name)
+
+
+class PycryptodomeBackend(CryptoBackend):
+    """
+    Ciphers and digests from pycryptodome, or the API compatible legacy pycrypto.
+    """
+
+    name = 'pycryptodome'
+
+    @classmethod
+    def available(cls):
+        try:
+            importlib.import_module('Crypto.Cipher.AES')
+            return True
+        except ImportError:
+            return False
+
+    def digest(self, name):
+        return importlib.import_module('Crypto.Hash.' + name.upper())
+
+    def new_cipher(self, key, mode, iv):
+        if mode != MODE_CBC:
+            raise NotImplementedError('Cipher mode %s is not implemented' % mode)
+        from Crypto.Cipher import AES
+        return AES.new(key, AES.MODE_CBC, iv)
+
+
+class _CryptographyCipher(object):
+    """
+    Gives a cryptography cipher context the encrypt/decrypt interface of pycryptodome, including the output
+    argument writing into a caller supplied buffer.
+    """
+
+    def __init__(self, cipher):
+        self._cipher = cipher
+        self._encryptor = None
+        self._decryptor = None
+
+    def encrypt(self, data, output=None):
+        self._check_length(data)
+        if self._encryptor is None:
+            self._encryptor = self._cipher.encryptor()
+        return self._update(self._encryptor, data, output)
+
+    def decrypt(self, data, output=None):
+        self._check_length(data)
+        if self._decryptor is None:
+            self._decryptor = self._cipher.decryptor()
+        return self._update(self._decryptor, data, output)
+
+    @staticmethod
+    def _update(context, data, output):
+        if output is None:
+            return context.update(data)
+        if len(output) != len(data):
+            raise ValueError('output must have the same length as the input')
+
+        # update_into needs block size - 1 spare bytes in the output, so the last block is copied
+        data = memoryview(data)
+        cut = max(len(data) - AES_BLOCK_SIZE, 0)
+        if cut:
+            context.update_into(data[:cut], output)
+        output[cut:] = context.update(data[cut:])
+
+    @staticmethod
+    def _check_length(data):
+        # update() buffers a partial block instead of failing, reject it as pycryptodome does
+        if len(data) % AES_BLOCK_SIZE:
+            raise ValueError('Data must be padded to %d byte boundary in CBC mode' % AES_BLOCK_SIZE)
+
+
+class CryptographyBackend(CryptoBackend):
+    """
+    Ciphers from the OpenSSL based cryptography package, digests from hashlib which also uses OpenSSL.
+    """
+
+    name = 'cryptography'
+
+    @classmethod
+    def available(cls):
+        try:
+            importlib.import_module('cryptography.hazmat.primitives.ciphers')
+            return True
+        except ImportError:
+            return False
+
+    def new_cipher(self, key, mode, iv):
+        if mode != MODE_CBC:
+            raise NotImplementedError('Cipher mode %s is not implemented' % mode)
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        return _CryptographyCipher(Cipher(algorithms.AES(bytes(key)), modes.CBC(bytes(iv))))
+
+
+# backends in order of auto selection preference, fastest first
+BACKENDS = [CryptographyBackend, PycryptodomeBackend, HashlibBackend]
+
+_instances = {}
+
+
+def get_backend(name=None):
+    """
+    Get a backend by name, or the fastest installed one that provides ciphers.
+
+    :param name: str or CryptoBackend - backend name or instance, defaults to the JASYPT4PY_BACKEND variable
+    :return: the CryptoBackend
+    """
+    if isinstance(name, CryptoBackend):
+        return name
+    name = name or os.environ.get(BACKEND_ENV)
+    backend = _instances.get(name)
+    if backend is not None:
+        return backend
+
+    if name:
+        candidates = [b for b in BACKENDS if b.name == name]
+        if not candidates:
+            raise NotImplementedError('Backend %s is not implemented' % name)
+        if not candidates[0].available():
+            raise ImportError('Backend %s is not installed' % name)
+        backend_class = candidates[0]
+    else:
+        # stop at the first installed backend, so the libraries of the others are never imported
+        backend_class = next((b for b in BACKENDS if b.ciphers and b.available()), None)
+        if backend_class is None:
+            raise ImportError('No crypto backend installed, install cryptography or pycryptodome')
+
+    backend = _instances.get(backend_class.name)
+    if backend is None:
+        backend = _instances[backend_class.name] = backend_class()
+    # remember the auto selection under None as well
+    _instances[name] = backend
+    return backend
@@ -0,0 +1,191 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import binascii
+import mmap
+import os
+from collections import namedtuple
+
+from jasypt4py.exceptions import ArgumentError
+from jasypt4py.generator import PreparedPassword
+
+# a decrypted record passed to the callback, value is only valid during the callback
+BulkRecord = namedtuple('BulkRecord', ['offset', 'next_offset', 'value', 'error'])
+
+# outcome of a bulk run, offset is where a later run resumes
+BulkProgress = namedtuple('BulkProgress', ['records', 'errors', 'offset'])
+
+
+class PBEBulkDecryptor(object):
+    """
+    Decrypts files holding one base64 encoded cipher text per line, as written by StandardPBEStringEncryptor.encrypt.
+
+    The file is memory mapped one window at a time and records are read as views of the mapping, so resident
+    memory is bounded by the window size and the longest record whatever the file size. Records are addressed
+    by their byte offset, which allows random access, partitioning a file between workers and resuming a run.
+    """
+
+    DEFAULT_WINDOW_SIZE = 16 * 1024 * 1024
+
+    # base64 characters decoded at a time, a multiple of 4
+    DECODE_CHUNK = 64 * 1024
+
+    def __init__(self, encryptor, window_size=DEFAULT_WINDOW_SIZE):
+        """
+
+        :param encryptor: StandardPBEStringEncryptor - the encryptor matching the dump
+        :param window_size: int - bytes mapped at a time, rounded up to the mmap allocation granularity
+        """
+        if window_size < 1:
+            raise ArgumentError('window_size must be a positive number')
+        self.encryptor = encryptor
+        self.window_size = -(-window_size // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+
+    def records(self, path, start=0, end=None):
+        """
+        Iterate the lines of a file without copying them.
+
+        :param path: str - the file to read
+        :param start: int - offset of the first record, 0 or an offset reported for an earlier record
+        :param end: int - records starting at or after this offset are not read, defaults to the end of file
+        :return: generator of (offset, next_offset, line) where line is a memoryview without the line break that
+            is only valid until the next record is requested
+        """
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if end is None else min(end, size)
+            pos = start
+            window = self.window_size
+
+            while pos < end:
+                base = pos - pos % mmap.ALLOCATIONGRANULARITY
+                length = min(window, size - base)
+                resumed = pos
+
+                mapped = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=base)
+                view = memoryview(mapped)
+                try:
+                    while pos < end:
+                        newline = mapped.find(b'\n', pos - base)
+                        if newline == -1:
+                            if base + length < size:
+                                # the record continues past this window
+                                break
+                            newline = length
+                        line = view[pos - base:newline]
+                        try:
+                            yield pos, min(base + newline + 1, size), line
+                        finally:
+                            line.release()
+                        pos = base + newline + 1
+                finally:
+                    view.release()
+                    mapped.close()
+
+                # a single record longer than the window needs a larger one
+                if pos == resumed:
+                    window *= 2
+
+    def offsets(self, path, start=0, end=None):
+        """
+        :return: generator of the record offsets of a file, e.g. to build an index for decrypt_record
+        """
+        for offset, _, _ in self.records(path, start, end):
+            yield offset
+
+    def decrypt_record(self, password, path, offset, iterations=1000):
+        """
+        Decrypt the record at an offset.
+
+        :param password: str or PreparedPassword - the password used for the key material
+        :param path: str - the file to read
+        :param offset: int - the record offset
+        :param iterations: int - number of hash iterations for key material
+        :return: bytes - the plain text
+        """
+        for _, _, line in self.records(path, offset):
+            return self.encryptor.decrypt_bytes(password, binascii.a2b_base64(line), iterations)
+        raise ValueError('no record at offset %d' % offset)
+
+    def decrypt(self, password, path, target=None, callback=None, iterations=1000, start=0, end=None):
+        """
+        Decrypt the records of a file.
+
+        Each plain text is written to target followed by a line break. Records that fail to decrypt are written
+        unchanged so the output stays line aligned, and are reported to the callback only.
+
+        :param password: str or PreparedPassword - the password used for the key material
+        :param path: str - the file to read
+        :param target: file - binary file-like object to write the plain texts to
+        :param callback: callable - called with a BulkRecord per record, its value is a view of a reused buffer
+        :param iterations: int - number of hash iterations for key material
+        :param start: int - offset of the first record, e.g. the offset of a previous BulkProgress to resume
+        :param end: int - records starting at or after this offset are left for another run
+        :return: BulkProgress with the number of records and errors and the offset after the last record
+        """
+        # convert the password once for all records
+        prepared = password if isinstance(password, PreparedPassword) else PreparedPassword(password)
+        decoded = bytearray(256)
+        out = bytearray(256)
+        records = errors = 0
+        offset = start
+        try:
+            for offset, next_offset, line in self.records(path, start, end):
+                records += 1
+                try:
+                    decoded, size = self._decode(line, decoded)
+                    if len(out) <= size:
+                        out = bytearray(len(decoded) + 1)
+                    data = memoryview(decoded)[:size]
+                    try:
+                        size = self.encryptor.decrypt_into(prepared, data, out, iterations)
+                    finally:
+                        data.release()
+                except Exception as e:
+                    errors += 1
+                    if target is not None:
+                        target.write(line)
+                        target.write(b'\n')
+                    if callback is not None:
+                        callback(BulkRecord(offset, next_offset, None, e))
+                else:
+                    # the line break goes after the plain text so each record is a single write
+                    out[size] = 0x0a
+                    view = memoryview(out)
+                    if target is not None:
+                        target.write(view[:size + 1])
+                    if callback is not None:
+                        callback(BulkRecord(offset, next_offset, view[:size], None))
+                    view.release()
+                offset = next_offset
+        finally:
+            if prepared is not password:
+                prepared.close()
+        return BulkProgress(records, errors, offset)
+
+    def _decode(self, line, buf):
+        """
+        Decode a base64 record into a reused buffer, a slice of DECODE_CHUNK characters at a time so the
+        temporary bytes stay small whatever the record length.
+
+        :return: the buffer, grown if the record did not fit, and the decoded size
+        """
+        if len(buf) < len(line) // 4 * 3:
+            buf = bytearray(len(line) // 4 * 3 * 2)
+        view = memoryview(buf)
+        size = 0
+        try:
+            for i in range(0, len(line), self.DECODE_CHUNK):
+                part = binascii.a2b_base64(line[i:i + self.DECODE_CHUNK])
+                view[size:size + len(part)] = part
+                size += len(part)
+        except binascii.Error:
+            # whitespace inside the record shifts the slices off the 4 character groups
+            part = binascii.a2b_base64(line)
+            size = len(part)
+            if len(buf) < size:
+                return bytearray(part), size
+            view[:size] = part
+        finally:
+            view.release()
+        return buf, size
@@ -0,0 +1,228 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import hashlib
+import heapq
+import hmac
+import itertools
+import os
+import threading
+import time
+import weakref
+
+from jasypt4py.exceptions import ArgumentError
+from jasypt4py.generator import PreparedPassword
+
+# prefer a clock that does not jump with wall time adjustments
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class DerivedKeyCache(object):
+    """
+    A bounded LRU cache of derived (key, iv) pairs.
+
+    Entries are looked up by a keyed digest of the password, salt, iteration count and algorithm so the
+    plaintext password is never held as a cache key. The digest key is random per cache instance.
+
+    Lookups do not take a lock: they read a plain dict, stamp the entry with a use counter and count hits and
+    misses in per thread counters, folded into a total once their thread exited. Inserts, evictions and
+    invalidation are serialized by a lock. When full, the least recently used tenth of the entries is evicted at
+    once.
+    """
+
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=None):
+        """
+
+        :param max_size: int - maximum number of derived parameter pairs to hold
+        :param ttl: float - seconds after which an entry expires, None to never expire
+        """
+        if max_size is None or max_size < 1:
+            raise ArgumentError('max_size must be a positive number')
+        if ttl is not None and ttl <= 0:
+            raise ArgumentError('ttl must be a positive number of seconds')
+        self.max_size = max_size
+        self.ttl = ttl
+        self._digest_key = os.urandom(32)
+        # key -> [parameters, created, last used]
+        self._entries = {}
+        self._ticks = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (thread weak reference, [hits, misses]) per thread, and the counts of exited threads
+        self._counters = []
+        self._folded = [0, 0]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        hits, misses = self.hits, self.misses
+        with self._lock:
+            entries = dict((key, list(entry)) for key, entry in self._entries.items())
+        return {'max_size': self.max_size, 'ttl': self.ttl, 'digest_key': self._digest_key, 'entries': entries,
+                'counts': [hits, misses]}
+
+    def __setstate__(self, state):
+        self.__init__(state['max_size'], state['ttl'])
+        self._digest_key = state['digest_key']
+        self._entries = state['entries']
+        self._folded = state['counts']
+        self._ticks = itertools.count(max([entry[2] for entry in self._entries.values()] + [-1]) + 1)
+
+    def merge(self, other):
+        """
+        Add the entries missing from this cache and the lookup counts of a copy, e.g. the copy used by a worker
+        process after reset_counters.
+
+        :param other: DerivedKeyCache - a pickled copy of this cache
+        """
+        if other._digest_key != self._digest_key:
+            raise ArgumentError('only copies of this cache can be merged')
+        hits, misses = other.hits, other.misses
+        with self._lock:
+            for key, entry in list(other._entries.items()):
+                if key not in self._entries:
+                    self._entries[key] = [entry[0], entry[1], next(self._ticks)]
+            self._evict()
+            self._folded[0] += hits
+            self._folded[1] += misses
+
+    @property
+    def hits(self):
+        return self._count(0)
+
+    @property
+    def misses(self):
+        return self._count(1)
+
+    def _count(self, index):
+        with self._lock:
+            self._fold()
+            return self._folded[index] + sum(counter[index] for _, counter in self._counters)
+
+    def _fold(self):
+        # add the counters of exited threads to the totals so threads coming and going do not grow the list
+        live = []
+        for thread, counter in self._counters:
+            t = thread()
+            if t is not None and t.is_alive():
+                live.append((thread, counter))
+            else:
+                self._folded[0] += counter[0]
+                self._folded[1] += counter[1]
+        self._counters = live
+
+    def _counter(self):
+        counter = getattr(self._local, 'counter', None)
+        if counter is None:
+            counter = self._local.counter = [0, 0]
+            with self._lock:
+                self._fold()
+                self._counters.append((weakref.ref(threading.current_thread()), counter))
+        return counter
+
+    def cache_key(self, password, salt, iterations, namespace=''):
+        """
+        Compute the keyed digest used to identify an entry.
+
+        :param password: str or PreparedPassword - the password used for the key material
+        :param salt: byte[] - the salt used for the key material
+        :param iterations: int - number of hash iterations
+        :param namespace: str - distinguishes entries of different algorithms sharing a cache
+        :return: the opaque cache key
+        """
+        mac = hmac.new(self._digest_key, digestmod=hashlib.sha256)
+        if isinstance(password, PreparedPassword):
+            password = password.pkcs12_bytes
+        for part in (namespace, password):
+            if not isinstance(part, (bytes, bytearray)):
+                part = part.encode('utf-8')
+            mac.update(str(len(part)).encode('ascii') + b':')
+            mac.update(part)
+        mac.update(str(iterations).encode('ascii') + b':')
+        mac.update(bytes(salt))
+        return mac.digest()
+
+    def get(self, key):
+        """
+        Look up the derived parameters for a cache key.
+
+        :param key: the key as returned by cache_key
+        :return: the (key, iv) tuple or None when absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and _clock() - entry[1] > self.ttl:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry = None
+        if entry is None:
+            self._counter()[1] += 1
+            return None
+        entry[2] = next(self._ticks)
+        self._counter()[0] += 1
+        return entry[0]
+
+    def put(self, key, parameters):
+        """
+        Store derived parameters, evicting the least recently used entries when full.
+
+        :param key: the key as returned by cache_key
+        :param parameters: tuple - the derived (key, iv)
+        """
+        with self._lock:
+            self._entries[key] = [parameters, _clock(), next(self._ticks)]
+            self._evict()
+
+    def _evict(self):
+        if len(self._entries) > self.max_size:
+            evict = len(self._entries) - self.max_size + self.max_size // 10
+            for old_key, _ in heapq.nsmallest(evict, list(self._entries.items()), key=lambda item: item[1][2]):
+                del self._entries[old_key]
+
+    def get_or_derive(self, password, salt, iterations, derive, namespace=''):
+        """
+        Return cached parameters or derive and store them.
+
+        :param password: str - the password used for the key material
+        :param salt: byte[] - the salt used for the key material
+        :param iterations: int - number of hash iterations
+        :param derive: callable - invoked with (password, salt, iterations) on a cache miss
+        :param namespace: str - distinguishes entries of different algorithms sharing a cache
+        :return: the derived (key, iv)
+        """
+        key = self.cache_key(password, salt, iterations, namespace)
+        parameters = self.get(key)
+        if parameters is None:
+            parameters = derive(password, salt, iterations)
+            self.put(key, parameters)
+        return parameters
+
+    def invalidate(self, password, salt, iterations, namespace=''):
+        """
+        Drop a single entry.
+
+        :return: True if an entry was removed
+        """
+        key = self.cache_key(password, salt, iterations, namespace)
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """
+        Drop all entries and reset the hit/miss counters.
+        """
+        with self._lock:
+            self._entries.clear()
+        self.reset_counters()
+
+    def reset_counters(self):
+        """
+        Reset the hit/miss counters, keeping the entries.
+        """
+        with self._lock:
+            self._folded = [0, 0]
+            for _, counter in self._counters:
+                counter[0] = counter[1] = 0
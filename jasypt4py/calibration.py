@@ -0,0 +1,168 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from jasypt4py.exceptions import ArgumentError
+from jasypt4py.metrics import timer
+
+# environment variable that overrides the calibration cache file
+CALIBRATION_CACHE_ENV = 'JASYPT4PY_CALIBRATION_CACHE'
+
+# calibrations older than this are measured again, hardware or load may have changed
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+
+class Calibration(namedtuple('Calibration', ['seconds_per_iteration', 'fixed_seconds', 'measured_iterations',
+                                             'created'])):
+    """
+    Measured key derivation cost of a parameter generator on this machine.
+
+    fixed_seconds covers password encoding, salt handling and the first hash, seconds_per_iteration each further
+    hash iteration, both for a complete generate_derived_parameters call.
+    """
+    __slots__ = ()
+
+    def duration(self, iterations):
+        """
+        :param iterations: int - number of hash iterations
+        :return: float - expected seconds of one key derivation
+        """
+        return self.fixed_seconds + self.seconds_per_iteration * max(iterations - 1, 0)
+
+    def iterations_for(self, budget):
+        """
+        :param budget: float - key derivation latency budget in seconds
+        :return: int - the largest iteration count whose derivation fits the budget, at least 1
+        """
+        if budget <= 0:
+            raise ArgumentError('budget must be a positive number of seconds')
+        return max(int((budget - self.fixed_seconds) / self.seconds_per_iteration) + 1, 1)
+
+
+def default_cache_path():
+    """
+    :return: str - the calibration cache file, JASYPT4PY_CALIBRATION_CACHE or a file in the user cache directory
+    """
+    path = os.environ.get(CALIBRATION_CACHE_ENV)
+    if path:
+        return path
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'jasypt4py', 'calibration.json')
+
+
+class CalibrationCache(object):
+    """
+    JSON file of calibrations keyed by host, interpreter and generator, shared by all processes of a host.
+    """
+
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE):
+        """
+
+        :param path: str - the cache file, defaults to default_cache_path()
+        :param max_age: int - seconds after which a calibration is measured again
+        """
+        self.path = path or default_cache_path()
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, key):
+        # a malformed entry, e.g. written by another version or edited by hand, is measured again
+        try:
+            calibration = Calibration(**self._read().get(key))
+            if not calibration.seconds_per_iteration > 0 or time.time() - calibration.created > self.max_age:
+                return None
+        except (TypeError, ValueError):
+            return None
+        return calibration
+
+    def put(self, key, calibration):
+        with self._lock:
+            entries = self._read()
+            entries[key] = calibration._asdict()
+            directory = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            # replace the file in one step so concurrent readers never see a partial write
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.calibration')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(entries, f, indent=2, sort_keys=True)
+                getattr(os, 'replace', os.rename)(tmp, self.path)
+            except Exception:
+                os.remove(tmp)
+                raise
+
+
+def calibration_key(generator):
+    """
+    :param generator: PBEParameterGenerator - the generator to calibrate
+    :return: str - identifies the host, interpreter, generator and digest implementation
+    """
+    digest = getattr(generator, 'hash_name', None)
+    if digest is None:
+        digest = getattr(generator.digest_factory, '__name__', type(generator.digest_factory).__name__)
+    return '%s/%s/%s %s/%s/%s/%d/%d' % (platform.node(), platform.machine(), platform.python_implementation(),
+                                        '.'.join(str(v) for v in sys.version_info[:2]), type(generator).__name__,
+                                        digest, generator.key_size_bits, generator.iv_size_bits or 0)
+
+
+def _best(generator, iterations, runs):
+    best = None
+    for _ in range(runs):
+        salt = bytearray(os.urandom(16))
+        started = timer()
+        generator.generate_derived_parameters('calibration', salt, iterations)
+        elapsed = timer() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate(generator, min_time=0.1, cache=None):
+    """
+    Measure the key derivation cost of a generator, or read it from the cache.
+
+    The iteration count is doubled until one derivation takes a tenth of min_time, then the best of several runs at
+    that count and at 1 iteration give the per iteration and fixed cost.
+
+    :param generator: PBEParameterGenerator - the generator to calibrate
+    :param min_time: float - approximate seconds to spend measuring
+    :param cache: CalibrationCache or bool - cache to use, True for the default file, None or False to always measure
+    :return: Calibration
+    """
+    if cache is True:
+        cache = CalibrationCache()
+    key = calibration_key(generator)
+    if cache:
+        calibration = cache.get(key)
+        if calibration is not None:
+            return calibration
+
+    iterations = 1000
+    while _best(generator, iterations, 1) < min_time / 10 and iterations < 1 << 30:
+        iterations *= 2
+
+    runs = 3
+    fixed = _best(generator, 1, runs)
+    seconds_per_iteration = max((_best(generator, iterations, runs) - fixed) / (iterations - 1), 1e-12)
+    calibration = Calibration(seconds_per_iteration, fixed, iterations, time.time())
+
+    if cache:
+        cache.put(key, calibration)
+    return calibration
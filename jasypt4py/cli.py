@@ -0,0 +1,229 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import argparse
+import getpass
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from functools import partial
+
+from jasypt4py.encryptor import BatchResult, StandardPBEStringEncryptor, _process_batch
+from jasypt4py.exceptions import ArgumentError
+
+DEFAULT_ALGORITHM = 'PBEWITHSHA256AND256BITAES-CBC'
+PASSWORD_ENV = 'JASYPT4PY_PASSWORD'
+NEW_PASSWORD_ENV = 'JASYPT4PY_NEW_PASSWORD'
+
+
+def _rotate_batch(old_args, new_args, old_password, new_password, old_iterations, new_iterations, values):
+    """
+    Decrypt a chunk with the old settings and encrypt it with the new ones in a worker.
+    """
+    old = StandardPBEStringEncryptor(old_args[0], salt_generator=old_args[1], **old_args[2])
+    new = StandardPBEStringEncryptor(new_args[0], salt_generator=new_args[1], **new_args[2])
+    results = []
+    for value in values:
+        try:
+            results.append(BatchResult(new.encrypt(new_password, old.decrypt(old_password, value, old_iterations),
+                                                   new_iterations), None))
+        except Exception as e:
+            results.append(BatchResult(None, e))
+    return results
+
+
+def _chunks(lines, chunk_size):
+    values = (line.rstrip('\r\n') for line in lines)
+    while True:
+        chunk = list(itertools.islice(values, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _bounded_map(func, chunks, workers):
+    """
+    Map func over chunks in order with at most 2 chunks per worker in flight, so memory stays constant.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, func(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(func, chunk)))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+class _Progress(object):
+    """
+    Reports throughput to stderr at most once per interval and on completion.
+    """
+
+    def __init__(self, enabled, interval=1.0):
+        self.enabled = enabled
+        self.interval = interval
+        self.count = 0
+        self.errors = 0
+        self.started = self._last = time.time()
+
+    def update(self, count, errors):
+        self.count += count
+        self.errors += errors
+        if time.time() - self._last >= self.interval:
+            self._last = time.time()
+            self.report()
+
+    def report(self):
+        if not self.enabled:
+            return
+        elapsed = max(time.time() - self.started, 1e-9)
+        sys.stderr.write('%d values, %d errors, %.1fs, %.1f values/s\n' % (self.count, self.errors, elapsed,
+                                                                           self.count / elapsed))
+        sys.stderr.flush()
+
+
+def _password(value, env, prompt):
+    if value:
+        return value
+    if os.environ.get(env):
+        return os.environ[env]
+    return getpass.getpass(prompt)
+
+
+def _encryptor_args(algorithm, backend, authenticated=False):
+    return algorithm, 'Random', {'backend': backend, 'authenticated': authenticated}
+
+
+def _run(args):
+    workers = args.workers if args.workers is not None else multiprocessing.cpu_count()
+    old_args = _encryptor_args(args.algorithm, args.backend, args.authenticated)
+    # validate the algorithm before starting workers
+    StandardPBEStringEncryptor(old_args[0], salt_generator=old_args[1], **old_args[2])
+    password = _password(args.password, PASSWORD_ENV, 'Password: ')
+
+    if args.command == 'rotate':
+        new_args = _encryptor_args(args.new_algorithm or args.algorithm, args.backend, args.new_authenticated)
+        StandardPBEStringEncryptor(new_args[0], salt_generator=new_args[1], **new_args[2])
+        new_password = _password(args.new_password, NEW_PASSWORD_ENV, 'New password: ')
+        func = partial(_rotate_batch, old_args, new_args, password, new_password, args.iterations,
+                       args.new_iterations or args.iterations)
+    else:
+        func = partial(_process_batch, old_args, args.command, password, iterations=args.iterations)
+
+    source = open(args.input) if args.input else sys.stdin
+    target = open(args.output, 'w') if args.output else sys.stdout
+    progress = _Progress(not args.quiet)
+    try:
+        for chunk, results in _bounded_map(func, _chunks(source, args.chunk_size), workers):
+            errors = 0
+            for i, (value, result) in enumerate(zip(chunk, results)):
+                if result.error is not None:
+                    # keep the input value so the output stays line aligned
+                    errors += 1
+                    sys.stderr.write('line %d: %s: %s\n' % (progress.count + i + 1, type(result.error).__name__,
+                                                            result.error))
+                    target.write(value + '\n')
+                else:
+                    target.write(result.value + '\n')
+            progress.update(len(chunk), errors)
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            target.close()
+    progress.report()
+    return 1 if progress.errors else 0
+
+
+def _calibrate(args):
+    encryptor = StandardPBEStringEncryptor(args.algorithm, backend=args.backend)
+    calibration = encryptor.calibrate(args.min_time, cache=not args.no_cache)
+    if not args.quiet:
+        sys.stderr.write('%s with %s: %.3g seconds per iteration, %.3g seconds fixed cost\n' % (
+            args.algorithm, encryptor.backend.name, calibration.seconds_per_iteration, calibration.fixed_seconds))
+    print(calibration.iterations_for(args.budget))
+    return 0
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError('%s is not a positive integer' % value)
+    return number
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog='jasypt4py',
+                                     description='Jasypt compatible encryption, decryption and re-encryption of '
+                                                 'values, one value per line.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    for name, description in (('encrypt', 'encrypt plain text values'),
+                              ('decrypt', 'decrypt base64 cipher texts'),
+                              ('rotate', 'decrypt with the current and encrypt with new settings')):
+        command = commands.add_parser(name, help=description, description=description)
+        command.add_argument('-i', '--input', help='file to read values from, defaults to stdin')
+        command.add_argument('-o', '--output', help='file to write results to, defaults to stdout')
+        command.add_argument('-a', '--algorithm', default=DEFAULT_ALGORITHM, help='default %(default)s')
+        command.add_argument('-n', '--iterations', type=_positive_int, default=1000,
+                             help='keyObtentionIterations, default %(default)s')
+        command.add_argument('-p', '--password',
+                             help='password, defaults to the %s variable or a prompt' % PASSWORD_ENV)
+        command.add_argument('--backend', help='crypto backend, defaults to the fastest installed one')
+        command.add_argument('-w', '--workers', type=_positive_int, help='worker processes, defaults to the cpu count')
+        command.add_argument('--chunk-size', type=_positive_int, default=256,
+                             help='values per work item, default %(default)s')
+        command.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+        command.add_argument('--authenticated', action='store_true',
+                             help='values carry an HMAC tag, not readable by Jasypt')
+        if name == 'rotate':
+            command.add_argument('--new-algorithm', help='algorithm to re-encrypt with, defaults to --algorithm')
+            command.add_argument('--new-iterations', type=_positive_int,
+                                 help='iterations to re-encrypt with, defaults to --iterations')
+            command.add_argument('--new-authenticated', action='store_true',
+                                 help='re-encrypt with an HMAC tag, not readable by Jasypt')
+            command.add_argument('--new-password',
+                                 help='password to re-encrypt with, defaults to the %s variable or a prompt'
+                                      % NEW_PASSWORD_ENV)
+
+    description = 'print the largest iteration count whose key derivation fits a latency budget on this machine'
+    command = commands.add_parser('calibrate', help=description, description=description)
+    command.add_argument('-b', '--budget', type=float, default=0.05, help='budget in seconds, default %(default)s')
+    command.add_argument('-a', '--algorithm', default=DEFAULT_ALGORITHM, help='default %(default)s')
+    command.add_argument('--backend', help='crypto backend, defaults to the fastest installed one')
+    command.add_argument('--min-time', type=float, default=0.1, help='seconds to spend measuring, default %(default)s')
+    command.add_argument('--no-cache', action='store_true', help='measure even if a cached calibration exists')
+    command.add_argument('-q', '--quiet', action='store_true', help='only print the iteration count')
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    try:
+        if args.command == 'calibrate':
+            return _calibrate(args)
+        return _run(args)
+    except (NotImplementedError, ImportError, IOError, ArgumentError) as e:
+        sys.stderr.write('jasypt4py: %s\n' % e)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
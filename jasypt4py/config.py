@@ -0,0 +1,252 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import json
+import os
+import re
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+try:
+    _unichr = unichr
+except NameError:
+    _unichr = chr
+
+# matches Jasypt placeholders as used by jasypt-spring-boot, e.g. ENC(xgX5+yRb...)
+ENC_PATTERN = re.compile(r'ENC\(([^)]*)\)')
+
+# escape sequences of java properties besides \\uXXXX, any other escaped character stands for itself
+_PROPERTIES_ESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', 'f': '\f'}
+
+FORMATS = {
+    '.properties': 'properties',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.env': 'dotenv',
+}
+
+
+def _parse_properties(lines):
+    """
+    Parse java properties, supporting comments, '=', ':' or whitespace separators, line continuations and the
+    escapes of java.util.Properties in keys and values.
+    """
+    result = {}
+    logical = ''
+    for line in list(lines) + ['']:
+        line = line.rstrip('\r\n').lstrip()
+        if not logical and (not line or line[0] in '#!'):
+            continue
+
+        # an odd number of trailing backslashes continues the line
+        if (len(line) - len(line.rstrip('\\'))) % 2 == 1:
+            logical += line[:-1]
+            continue
+
+        logical += line
+        match = re.match(r'((?:[^\\:=\s]|\\.)*)\s*[:=]?\s*(.*)$', logical, re.S)
+        result[_unescape_properties(match.group(1))] = _unescape_properties(match.group(2))
+        logical = ''
+    return result
+
+
+def _unescape_properties(text):
+    def replace(match):
+        escaped = match.group(1)
+        if escaped[0] == 'u':
+            if len(escaped) != 5:
+                raise ValueError('Malformed \\uxxxx encoding in properties: %s' % text)
+            return _unichr(int(escaped[1:], 16))
+        return _PROPERTIES_ESCAPES.get(escaped, escaped)
+
+    return re.sub(r'\\(u[0-9a-fA-F]{4}|.)', replace, text, flags=re.S) if '\\' in text else text
+
+
+def _parse_dotenv(lines):
+    result = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.strip()
+        if key.startswith('export '):
+            key = key[len('export '):].strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        result[key] = value
+    return result
+
+
+def _load_yaml(f):
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError('PyYAML is required to read YAML configuration')
+    return yaml.safe_load(f)
+
+
+def _collect_tokens(value, tokens):
+    if isinstance(value, dict):
+        for v in value.values():
+            _collect_tokens(v, tokens)
+    elif isinstance(value, list):
+        for v in value:
+            _collect_tokens(v, tokens)
+    elif isinstance(value, string_types):
+        for token in ENC_PATTERN.findall(value):
+            tokens.setdefault(token, None)
+    return tokens
+
+
+def _substitute(value, plain):
+    if isinstance(value, dict):
+        return dict((k, _substitute(v, plain)) for k, v in value.items())
+    elif isinstance(value, list):
+        return [_substitute(v, plain) for v in value]
+    elif isinstance(value, string_types) and 'ENC(' in value:
+        return ENC_PATTERN.sub(lambda m: plain(m.group(1)), value)
+    return value
+
+
+class ConfigResolver(object):
+    """
+    Decrypts Jasypt ENC(...) placeholders in properties, YAML, JSON and dotenv configuration.
+
+    Identical cipher texts are decrypted once, eager resolution decrypts all of them in one batch.
+    """
+
+    def __init__(self, encryptor, password, iterations=1000, workers=1):
+        """
+
+        :param encryptor: StandardPBEStringEncryptor - the encryptor matching the Jasypt configuration
+        :param password: str or PreparedPassword - the Jasypt password
+        :param iterations: int - the Jasypt keyObtentionIterations
+        :param workers: int - worker processes used for batch decryption, 1 decrypts in process
+        """
+        self.encryptor = encryptor
+        self.password = password
+        self.iterations = iterations
+        self.workers = workers
+        self._plain = {}
+
+    def decrypt(self, ciphertext):
+        """
+        Decrypt a single cipher text, remembering the result for identical cipher texts.
+        """
+        plain = self._plain.get(ciphertext)
+        if plain is None:
+            plain = self._plain[ciphertext] = self.encryptor.decrypt(self.password, ciphertext, self.iterations)
+        return plain
+
+    def decrypt_all(self, ciphertexts):
+        """
+        Decrypt all cipher texts that were not seen before in one batch.
+
+        :param ciphertexts: iterable - the cipher texts without the ENC() wrapper
+        """
+        pending = [c for c in dict.fromkeys(ciphertexts) if c not in self._plain]
+        results = self.encryptor.decrypt_many(self.password, pending, self.iterations, workers=self.workers)
+        for ciphertext, result in zip(pending, results):
+            if result.error is not None:
+                raise result.error
+            self._plain[ciphertext] = result.value
+
+    def resolve(self, value):
+        """
+        Replace all ENC(...) placeholders in a string, or in the values of a dict or list structure.
+
+        :return: a copy of value with the decrypted placeholders
+        """
+        self.decrypt_all(_collect_tokens(value, {}))
+        return _substitute(value, self.decrypt)
+
+    def load(self, source, format=None, lazy=False):
+        """
+        Load a configuration file and resolve its placeholders.
+
+        :param source: str or file - a path, or a text file-like object when format is given
+        :param format: str - properties, yaml, json or dotenv, detected from the file extension if omitted
+        :param lazy: bool - return a LazyConfig that decrypts a value on first access
+        :return: the resolved configuration, a dict for properties and dotenv files
+        """
+        if isinstance(source, string_types):
+            if format is None:
+                format = FORMATS.get(os.path.splitext(source)[1].lower())
+                if format is None and os.path.basename(source).startswith('.env'):
+                    format = 'dotenv'
+            with open(source) as f:
+                return self.load(f, format, lazy)
+
+        if format == 'properties':
+            config = _parse_properties(source)
+        elif format == 'dotenv':
+            config = _parse_dotenv(source)
+        elif format == 'json':
+            config = json.load(source)
+        elif format == 'yaml':
+            config = _load_yaml(source)
+        else:
+            raise NotImplementedError('Configuration format %s is not implemented' % format)
+
+        if lazy:
+            return LazyConfig(config, self)
+        return self.resolve(config)
+
+    def rewrite(self, source, target, batch_lines=1024):
+        """
+        Stream text from source to target replacing ENC(...) placeholders with their plain text.
+
+        :param source: file - text file-like object to read from
+        :param target: file - text file-like object to write to
+        :param batch_lines: int - number of lines read and decrypted as one batch
+        """
+        lines = []
+        for line in source:
+            lines.append(line)
+            if len(lines) >= batch_lines:
+                target.write(self.resolve(''.join(lines)))
+                lines = []
+        if lines:
+            target.write(self.resolve(''.join(lines)))
+
+
+class LazyConfig(Mapping):
+    """
+    A read only configuration mapping that decrypts ENC(...) placeholders the first time a value is read.
+    """
+
+    def __init__(self, config, resolver):
+        self._config = config
+        self._resolver = resolver
+        self._resolved = {}
+
+    def __getitem__(self, key):
+        if key in self._resolved:
+            return self._resolved[key]
+        value = self._lazy(self._config[key])
+        self._resolved[key] = value
+        return value
+
+    def _lazy(self, value):
+        if isinstance(value, dict):
+            return LazyConfig(value, self._resolver)
+        elif isinstance(value, list):
+            return [self._lazy(v) for v in value]
+        return _substitute(value, self._resolver.decrypt)
+
+    def __iter__(self):
+        return iter(self._config)
+
+    def __len__(self):
+        return len(self._config)
@@ -1,17 +1,26 @@
 # Make coding more python3-ish
 from __future__ import (absolute_import, division, print_function)
 
+import hashlib
+import hmac
 import sys
 from abc import ABCMeta
+from collections import namedtuple
 from base64 import b64encode, b64decode
-from Crypto.Cipher import AES
-from Crypto.Hash import SHA256
 
-from jasypt4py.generator import PKCS12ParameterGenerator, RandomSaltGenerator, FixedSaltGenerator
+from jasypt4py.algorithm import LAYOUT_SALT_IV, get_algorithm
+from jasypt4py.backend import AES_BLOCK_SIZE, get_backend
+from jasypt4py.exceptions import ArgumentError, AuthenticationError
+from jasypt4py.metrics import timer, DerivationObserver, SALT_GENERATION, CIPHER, ENCODING
+from jasypt4py.generator import PreparedPassword, RandomSaltGenerator, BufferedRandomSaltGenerator, \
+    FixedSaltGenerator, RandomIvGenerator, FixedIvGenerator
 
 PY2 = sys.version_info[0] == 2
 PY3 = sys.version_info[0] == 3
 
+# size of the HMAC-SHA256 mac key and of the tag appended in authenticated mode
+MAC_SIZE = 32
+
 # an encode function that takes a byte array and returns an encoded python string
 if PY2:
     str_encode = lambda s: str(s)
@@ -19,38 +28,140 @@ elif PY3:
     str_encode = lambda s: str(s, 'utf-8')
 
 
+def _byte_view(data):
+    """
+    A flat unsigned byte memoryview over any buffer protocol object.
+    """
+    view = memoryview(data)
+    if view.itemsize != 1 or view.format != 'B':
+        view = view.cast('B')
+    return view
+
+
+def _cipher_into(func, data, out):
+    """
+    Run a cipher encrypt or decrypt writing straight into out, copying the result for ciphers without an output
+    argument (legacy pycrypto).
+    """
+    try:
+        func(data, output=out)
+    except TypeError:
+        out[:] = func(data)
+
+
+# the outcome of a single item in a batch operation, exactly one of value and error is set
+BatchResult = namedtuple('BatchResult', ['value', 'error'])
+
+
+def _process_batch(init_args, method, password, values, iterations):
+    """
+    Process a chunk of values in a worker, building the encryptor from its constructor arguments as the
+    instance itself (digest modules, locks) can not be pickled.
+    """
+    algorithm, salt_generator, kwargs = init_args
+    encryptor = StandardPBEStringEncryptor(algorithm, salt_generator=salt_generator, **kwargs)
+    return encryptor._process_chunk(method, password, values, iterations)
+
+
+class _RecordingObserver(DerivationObserver):
+    """
+    Records the events of a worker process so they can be replayed on the observer of the calling process.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def on_phase(self, phase, seconds, iterations=None):
+        self.events.append((phase, seconds, iterations))
+
+    def on_cache(self, hit):
+        self.events.append((hit,))
+
+
+def _process_tracked_batch(init_args, key_cache, observed, method, password, values, iterations):
+    """
+    Process a chunk of values in a worker with a copy of the key cache and an observer recording the events.
+
+    :return: the results, the recorded events or None and the worker copy of the key cache
+    """
+    algorithm, salt_generator, kwargs = init_args
+    if key_cache is not None:
+        # only the lookups of this worker are added to the counts of the calling process
+        key_cache.reset_counters()
+    observer = _RecordingObserver() if observed else None
+    encryptor = StandardPBEStringEncryptor(algorithm, salt_generator=salt_generator, key_cache=key_cache,
+                                           observer=observer, **kwargs)
+    results = encryptor._process_chunk(method, password, values, iterations)
+    return results, observer.events if observed else None, key_cache
+
+
 class StandardPBEStringEncryptor(object):
+    """
+    Jasypt compatible password based string encryptor.
+
+    An instance is safe to share between threads: the key generators are stateless, a new cipher is created per
+    call, the salt and iv generators are thread-safe and the derived key cache serves lookups without locking.
+    """
     __metaclass__ = ABCMeta
 
-    def __init__(self, algorithm, salt_generator='Random', **kwargs):
+    def __init__(self, algorithm, salt_generator='Random', key_cache=None, backend=None, iv_generator=None,
+                 observer=None, authenticated=False, **kwargs):
+        """
+
+        :param algorithm: str - the Jasypt algorithm name
+        :param salt_generator: str - the salt generator to use, either Random, Buffered or Fixed
+        :param key_cache: DerivedKeyCache - optional cache of derived key and iv, useful when salts repeat
+        :param backend: str or CryptoBackend - crypto backend, defaults to the fastest installed one
+        :param iv_generator: str - the iv generator for PBKDF2 algorithms, either Random (default) or Fixed
+        :param observer: DerivationObserver - optional observer of phase timings and cache lookups
+        :param authenticated: bool - append an HMAC-SHA256 tag and verify it before decrypting, this format can not
+            be read by Jasypt
+        :param kwargs: additional arguments passed to the salt and iv generator
+        """
+        self.algorithm = algorithm
+        self.key_cache = key_cache
+        self.observer = observer
+        self.iv_generator = None
+        self.authenticated = authenticated
+        self._init_args = (algorithm, salt_generator, dict(kwargs, backend=backend, iv_generator=iv_generator,
+                                                           authenticated=authenticated))
 
         if salt_generator == 'Random':
             self.salt_generator = RandomSaltGenerator(**kwargs)
+        elif salt_generator == 'Buffered':
+            self.salt_generator = BufferedRandomSaltGenerator(**kwargs)
         elif salt_generator == 'Fixed':
             self.salt_generator = FixedSaltGenerator(**kwargs)
         else:
             raise NotImplementedError('Salt generator %s is not implemented' % salt_generator)
 
-        # setup the generators and cipher
-        if algorithm == 'PBEWITHSHA256AND256BITAES-CBC':
-
-            # create sha256 PKCS12 secret generator
-            self.key_generator = PKCS12ParameterGenerator(SHA256)
-
-            # setup the AES cipher
-            self._cipher_factory = AES.new
-            self._cipher_mode = AES.MODE_CBC
-        elif algorithm == 'PBEWITHSHA256AND128BITAES-CBC':
-
-            # create sha256 PKCS12 secret generator
-            self.key_generator = PKCS12ParameterGenerator(SHA256, key_size_bits=PKCS12ParameterGenerator.KEY_SIZE_128)
-
-            # setup the AES cipher
-            self._cipher_factory = AES.new
-            self._cipher_mode = AES.MODE_CBC
-
-        else:
-            raise NotImplementedError('Algorithm %s is not implemented' % algorithm)
+        # setup the generators and cipher from the shared algorithm description
+        self.descriptor = get_algorithm(algorithm)
+        self.backend = get_backend(backend)
+        if not self.backend.ciphers:
+            raise NotImplementedError('Backend %s does not provide ciphers, select cryptography or pycryptodome'
+                                      % self.backend.name)
+        self.key_generator = self.descriptor.key_generator(self.backend, observer)
+        self._cipher_factory = self.backend.new_cipher
+        self._cipher_mode = self.descriptor.mode
+
+        if self.descriptor.layout == LAYOUT_SALT_IV:
+            # the iv is random and travels with the cipher text
+            if iv_generator is None or iv_generator == 'Random':
+                self.iv_generator = RandomIvGenerator(**kwargs)
+            elif iv_generator == 'Fixed':
+                self.iv_generator = FixedIvGenerator(**kwargs)
+            else:
+                raise NotImplementedError('IV generator %s is not implemented' % iv_generator)
+        elif iv_generator is not None:
+            raise NotImplementedError('Algorithm %s derives the iv and does not use an iv generator' % algorithm)
+
+    @property
+    def iv_block_size(self):
+        """
+        :return: int - size of the plain iv stored after the salt, 0 for algorithms deriving the iv
+        """
+        return self.iv_generator.iv_block_size if self.iv_generator is not None else 0
 
     @staticmethod
     def pad(block_size, s):
@@ -61,7 +172,10 @@ class StandardPBEStringEncryptor(object):
         :param s: str - the string to pad
         :return: a padded string that can be fed to the cipher
         """
-        return s + (block_size - len(s) % block_size) * chr(block_size - len(s) % block_size)
+        padding = block_size - len(s) % block_size
+        if isinstance(s, (bytes, bytearray)):
+            return bytes(s) + bytes(bytearray([padding] * padding))
+        return s + padding * chr(padding)
 
     @staticmethod
     def unpad(s):
@@ -78,41 +192,439 @@ class StandardPBEStringEncryptor(object):
         else:
             raise ImportError('Only Python 2 and 3 are supported')
 
-    def encrypt(self, password, text, iterations=1000):
-
-        # generate a 16 byte salt which is used to generate key material and iv
-        salt = self.salt_generator.generate_salt()
+    def derive_parameters(self, password, salt, iterations=1000):
+        """
+        Generates the key and iv for a salt, consulting the key cache if one is configured.
 
-        # generate key material
-        key, iv = self.key_generator.generate_derived_parameters(password, salt, iterations)
+        :param password: str - the password used for the key material
+        :param salt: byte[] - the salt used for the key material
+        :param iterations: int - number of hash iterations for key material
+        :return: key and iv that can be used to setup the cipher, followed by the mac key in authenticated mode
+        """
+        if self.key_cache is None:
+            return self._derive(password, salt, iterations)
+
+        key, parameters = self._cache_get(password, salt, iterations)
+        if parameters is None:
+            parameters = self._derive(password, salt, iterations)
+            self.key_cache.put(key, parameters)
+        return parameters
+
+    def _cache_get(self, password, salt, iterations):
+        key = self.key_cache.cache_key(password, salt, iterations,
+                                       namespace=self.algorithm + (' HMAC' if self.authenticated else ''))
+        parameters = self.key_cache.get(key)
+        if self.observer is not None:
+            self.observer.on_cache(parameters is not None)
+        return key, parameters
+
+    def _derive(self, password, salt, iterations):
+        if self.authenticated:
+            # the mac key comes from the same derivation pass as key and iv
+            return self.key_generator.generate_derived_parameters(password, salt, iterations, mac_size=MAC_SIZE)
+        return self.key_generator.generate_derived_parameters(password, salt, iterations)
+
+    def new_cipher(self, password, salt, iterations=1000, iv=None):
+        """
+        Create the cipher for a salt, deriving the key and, unless supplied, the iv.
 
-        # setup AES cipher
-        cipher = self._cipher_factory(key, self._cipher_mode, iv)
+        :param password: str - the password used for the key material
+        :param salt: byte[] - the salt used for the key material
+        :param iterations: int - number of hash iterations for key material
+        :param iv: bytes - the plain iv for algorithms using an iv generator
+        :return: a cipher object with incremental encrypt(data) and decrypt(data)
+        """
+        parameters = self.derive_parameters(password, salt, iterations)
+        return self._cipher_factory(parameters[0], self._cipher_mode, iv or parameters[1])
 
-        # pad the plain text secret to AES block size
-        encrypted_message = cipher.encrypt(self.pad(AES.block_size, text))
+    def encrypt(self, password, text, iterations=1000):
 
         # concatenate salt + encrypted message
-        return str_encode(b64encode(bytes(salt) + encrypted_message))
+        return str_encode(self.encrypt_bytes(password, text.encode('utf-8'), iterations, encode=True))
 
     def decrypt(self, password, ciphertext, iterations=1000):
 
         # decode the base64 encoded and encrypted secret
-        n_cipher_bytes = b64decode(ciphertext)
+        return str_encode(self.decrypt_bytes(password, ciphertext, iterations, encoded=True))
+
+    def encrypt_bytes(self, password, data, iterations=1000, encode=False):
+        """
+        Encrypt binary data.
+
+        :param password: str - the password used for the key material
+        :param data: buffer - any object supporting the buffer protocol
+        :param iterations: int - number of hash iterations for key material
+        :param encode: bool - base64 encode the result as encrypt does
+        :return: bytes - salt + encrypted message
+        """
+        encrypted = b''.join(self._encrypt_parts(password, data, iterations))
+        if not encode:
+            return encrypted
+
+        started = timer() if self.observer is not None else 0
+        encoded = b64encode(encrypted)
+        if self.observer is not None:
+            self.observer.on_phase(ENCODING, timer() - started)
+        return encoded
 
-        # extract salt bytes 0 - SALT_SIZE
-        salt = n_cipher_bytes[:self.salt_generator.salt_block_size]
-        # print('dec-salt = %s' % binascii.hexlify(salt))
+    def encrypt_into(self, password, data, out, iterations=1000):
+        """
+        Encrypt binary data into a caller supplied buffer.
+
+        :param password: str - the password used for the key material
+        :param data: buffer - any object supporting the buffer protocol
+        :param out: buffer - writable buffer of at least encrypted_size(len(data)) bytes
+        :param iterations: int - number of hash iterations for key material
+        :return: int - the number of bytes written
+        """
+        out = _byte_view(out)
+        size = self.encrypted_size(len(_byte_view(data)))
+        if len(out) < size:
+            raise ValueError('output buffer of %d bytes is too small, %d bytes required' % (len(out), size))
+        return self._encrypt_parts(password, data, iterations, out)
+
+    def encrypted_size(self, size):
+        """
+        :param size: int - length of the plain text in bytes
+        :return: int - length of salt + encrypted message in bytes
+        """
+        return (self.salt_generator.salt_block_size + self.iv_block_size +
+                (size // AES_BLOCK_SIZE + 1) * AES_BLOCK_SIZE + (MAC_SIZE if self.authenticated else 0))
+
+    def decrypt_bytes(self, password, data, iterations=1000, encoded=False):
+        """
+        Decrypt binary data.
+
+        :param password: str - the password used for the key material
+        :param data: buffer - salt + encrypted message, any object supporting the buffer protocol
+        :param iterations: int - number of hash iterations for key material
+        :param encoded: bool - the data is base64 encoded as returned by encrypt
+        :return: bytes - the decrypted message
+        """
+        if encoded:
+            started = timer() if self.observer is not None else 0
+            data = b64decode(data)
+            if self.observer is not None:
+                self.observer.on_phase(ENCODING, timer() - started)
+        decoded, size = self._decrypt_parts(password, data, iterations)
+        return decoded[:size]
+
+    def decrypt_into(self, password, data, out, iterations=1000):
+        """
+        Decrypt binary data into a caller supplied buffer.
+
+        :param password: str - the password used for the key material
+        :param data: buffer - salt + encrypted message, any object supporting the buffer protocol
+        :param out: buffer - writable buffer large enough for the decrypted message, its content is undefined if
+            decryption fails
+        :param iterations: int - number of hash iterations for key material
+        :return: int - the number of bytes written
+        """
+        return self._decrypt_parts(password, data, iterations, _byte_view(out))
+
+    def _encrypt_parts(self, password, data, iterations, out=None):
+        """
+        :return: the list of salt, iv, cipher text and tag parts, or the number of bytes written if out is given
+        """
+        view = _byte_view(data)
+        observer = self.observer
+
+        # generate a 16 byte salt which is used to generate key material and iv
+        started = timer() if observer is not None else 0
+        salt = bytes(self.salt_generator.generate_salt())
+        iv = bytes(self.iv_generator.generate_iv()) if self.iv_generator is not None else b''
+        if observer is not None:
+            observer.on_phase(SALT_GENERATION, timer() - started)
+
+        # setup AES cipher
+        parameters = self.derive_parameters(password, salt, iterations)
+        cipher = self._cipher_factory(parameters[0], self._cipher_mode, iv or parameters[1])
+
+        # encrypt whole blocks straight from the input, pad only the trailing block
+        started = timer() if observer is not None else 0
+        cut = len(view) - len(view) % AES_BLOCK_SIZE
+        tail = self.pad(AES_BLOCK_SIZE, view[cut:].tobytes())
+        if out is None:
+            parts = [salt, iv, cipher.encrypt(view[:cut]), cipher.encrypt(tail)]
+            if self.authenticated:
+                # encrypt-then-mac over salt, iv and cipher text
+                parts.append(self._tag(parameters[2], parts))
+        else:
+            header = len(salt) + len(iv)
+            end = header + cut + AES_BLOCK_SIZE
+            out[:header] = salt + iv
+            if cut:
+                _cipher_into(cipher.encrypt, view[:cut], out[header:header + cut])
+            out[header + cut:end] = cipher.encrypt(tail)
+            if self.authenticated:
+                out[end:end + MAC_SIZE] = self._tag(parameters[2], [out[:end]])
+                end += MAC_SIZE
+            parts = end
+        if observer is not None:
+            observer.on_phase(CIPHER, timer() - started)
+        return parts
+
+    def _decrypt_parts(self, password, data, iterations, out=None):
+        """
+        :return: the decrypted message and its size without padding, or the number of bytes written if out is given
+        """
+        view = _byte_view(data)
+        salt_size = self.salt_generator.salt_block_size
+        header_size = salt_size + self.iv_block_size
+        end = len(view) - (MAC_SIZE if self.authenticated else 0)
+        # reject truncated input before paying for the key derivation
+        if end < header_size + AES_BLOCK_SIZE:
+            if self.authenticated:
+                raise AuthenticationError('cipher text is too short to hold a block and a tag')
+            raise ValueError('cipher text is too short to hold the salt, iv and a block')
+
+        # extract salt bytes 0 - SALT_SIZE, followed by the plain iv if the algorithm does not derive it
+        salt = view[:salt_size].tobytes()
+        iv = view[salt_size:header_size].tobytes()
 
         # create reverse key material
-        key, iv = self.key_generator.generate_derived_parameters(password, salt, iterations)
+        if self.authenticated:
+            parameters = self._verify(password, salt, iterations, view, end)
+        else:
+            parameters = self.derive_parameters(password, salt, iterations)
+
+        cipher = self._cipher_factory(parameters[0], self._cipher_mode, iv if self.iv_block_size else parameters[1])
+        if out is None:
+            return self._decrypt_body(cipher, view[header_size:end])
+        return self._decrypt_body_into(cipher, view[header_size:end], out)
+
+    def _verify(self, password, salt, iterations, view, end):
+        """
+        Check the tag of an authenticated cipher text, deriving only the mac key before the check so modified
+        data or a wrong password are rejected without the cost of the key and iv derivation.
+
+        :return: the key, iv and mac key once the tag matched
+        """
+        cache_key = parameters = derived = None
+        if self.key_cache is not None:
+            cache_key, parameters = self._cache_get(password, salt, iterations)
+        if parameters is not None:
+            mac_key = parameters[2]
+        else:
+            mac_key, derived = self.key_generator.generate_derived_mac_key(password, salt, iterations, MAC_SIZE)
+
+        # compare in constant time
+        if not hmac.compare_digest(self._tag(mac_key, [view[:end]]), view[end:].tobytes()):
+            raise AuthenticationError('cipher text authentication failed, wrong password or modified data')
+
+        if parameters is None:
+            if derived is None:
+                derived = self.key_generator.generate_derived_parameters(password, salt, iterations)
+            parameters = tuple(derived[:2]) + (mac_key,)
+            if cache_key is not None:
+                # only verified parameters are cached
+                self.key_cache.put(cache_key, parameters)
+        return parameters
+
+    @staticmethod
+    def _tag(mac_key, parts):
+        mac = hmac.new(mac_key, digestmod=hashlib.sha256)
+        for part in parts:
+            mac.update(part)
+        return mac.digest()
+
+    def _decrypt_body(self, cipher, body):
+        # decode the message bytes HEADER_SIZE - len(cipher), the padding length is in the last byte
+        started = timer() if self.observer is not None else 0
+        decoded = cipher.decrypt(body)
+        if self.observer is not None:
+            self.observer.on_phase(CIPHER, timer() - started)
+        if not decoded:
+            raise ValueError('cipher text is empty')
+        padding = bytearray(decoded[-1:])[0]
+
+        # same result as unpad which slices [0:-padding]
+        return decoded, max(len(decoded) - padding, 0) if padding else 0
+
+    def _decrypt_body_into(self, cipher, body, out):
+        # all but the last block are decrypted straight into out, the last one holds the padding
+        cut = len(body) - AES_BLOCK_SIZE
+        if cut > len(out):
+            # only an invalid padding can make the message fit, decrypt it the regular way
+            decoded, size = self._decrypt_body(cipher, body)
+            if size > len(out):
+                raise ValueError('output buffer of %d bytes is too small, %d bytes required' % (len(out), size))
+            out[:size] = memoryview(decoded)[:size]
+            return size
+
+        started = timer() if self.observer is not None else 0
+        if cut > 0:
+            _cipher_into(cipher.decrypt, body[:cut], out[:cut])
+        last = cipher.decrypt(body[max(cut, 0):])
+        if self.observer is not None:
+            self.observer.on_phase(CIPHER, timer() - started)
+        if not last:
+            raise ValueError('cipher text is empty')
+        padding = bytearray(last[-1:])[0]
+
+        size = max(len(body) - padding, 0) if padding else 0
+        if size > len(out):
+            raise ValueError('output buffer of %d bytes is too small, %d bytes required' % (len(out), size))
+        if size > cut:
+            out[cut:size] = last[:size - cut]
+        return size
+
+    def calibrate(self, min_time=0.1, cache=None):
+        """
+        Measure the key derivation cost of this algorithm and backend on the current machine.
+
+        :param min_time: float - approximate seconds to spend measuring
+        :param cache: CalibrationCache or bool - cache to use, True for the default file, None to always measure
+        :return: Calibration with the per iteration and fixed cost in seconds
+        """
+        # the shared generator, so calibration runs are not reported to the observer
+        return self.descriptor.key_generator(self.backend).calibrate(min_time, cache)
+
+    def recommend_iterations(self, budget, min_time=0.1, cache=None):
+        """
+        Recommend the iterations for a key derivation latency budget.
+
+        The iteration count is not stored in the cipher text, so the chosen value has to be configured for every
+        reader and should not be recomputed per host.
+
+        :param budget: float - key derivation latency budget in seconds
+        :param min_time: float - approximate seconds to spend measuring if no cached calibration exists
+        :param cache: CalibrationCache or bool - cache to use, True for the default file, None (the default) to
+            always measure without writing a file
+        :return: int - the largest iteration count whose key derivation fits the budget
+        """
+        return self.calibrate(min_time, cache).iterations_for(budget)
+
+    def bind(self, password):
+        """
+        Bind a password to this encryptor, converting it to PKCS12 bytes once for all later calls.
+
+        :param password: str - the password used for the key material
+        :return: a BoundPBEStringEncryptor, close it or use it as a context manager to zero the password
+        """
+        return BoundPBEStringEncryptor(self, password)
+
+    def encrypt_many(self, password, values, iterations=1000, workers=None, chunk_size=64):
+        """
+        Encrypt many values, spreading the work over a process pool.
+
+        Worker processes use a copy of the key cache and report to the observer once their chunk is done.
+
+        :param password: str - the password used for the key material
+        :param values: iterable - the plain text values
+        :param iterations: int - number of hash iterations for key material
+        :param workers: int - number of worker processes, defaults to the cpu count, 1 runs in process
+        :param chunk_size: int - number of values handed to a worker at a time
+        :return: a list of BatchResult in input order
+        """
+        return self._process_many('encrypt', password, values, iterations, workers, chunk_size)
+
+    def decrypt_many(self, password, values, iterations=1000, workers=None, chunk_size=64):
+        """
+        Decrypt many values, spreading the work over a process pool.
+
+        Worker processes use a copy of the key cache and report to the observer once their chunk is done.
+
+        :param password: str - the password used for the key material
+        :param values: iterable - the base64 encoded cipher texts
+        :param iterations: int - number of hash iterations for key material
+        :param workers: int - number of worker processes, defaults to the cpu count, 1 runs in process
+        :param chunk_size: int - number of values handed to a worker at a time
+        :return: a list of BatchResult in input order
+        """
+        return self._process_many('decrypt', password, values, iterations, workers, chunk_size)
+
+    def _process_many(self, method, password, values, iterations, workers, chunk_size):
+        if chunk_size < 1:
+            raise ArgumentError('chunk_size must be a positive number')
+        values = list(values)
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+        if workers is None:
+            import multiprocessing
+            workers = min(multiprocessing.cpu_count(), len(chunks))
+        if workers <= 1 or len(chunks) <= 1:
+            chunk_results = [self._process_chunk(method, password, chunk, iterations) for chunk in chunks]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunk_results = [self._merge_worker(outcome) for outcome in
+                                 executor.map(*self._worker_call(method, password, chunks, iterations))]
+
+        return [result for chunk in chunk_results for result in chunk]
+
+    def _worker_call(self, method, password, chunks, iterations):
+        """
+        The picklable function and argument lists processing chunks in worker processes.
+
+        Workers use a copy of the key cache and record the observer events, _merge_worker adds both to this
+        instance once a chunk is done.
+        """
+        n = len(chunks)
+        if self.key_cache is None and self.observer is None:
+            return _process_batch, [self._init_args] * n, [method] * n, [password] * n, chunks, [iterations] * n
+        return (_process_tracked_batch, [self._init_args] * n, [self.key_cache] * n, [self.observer is not None] * n,
+                [method] * n, [password] * n, chunks, [iterations] * n)
+
+    def _merge_worker(self, outcome):
+        if self.key_cache is None and self.observer is None:
+            return outcome
+        results, events, key_cache = outcome
+        if key_cache is not None:
+            self.key_cache.merge(key_cache)
+        for event in events or ():
+            if len(event) == 1:
+                self.observer.on_cache(*event)
+            else:
+                self.observer.on_phase(*event)
+        return results
+
+    def _process_chunk(self, method, password, values, iterations):
+        func = getattr(self, method)
+        results = []
+        for value in values:
+            try:
+                results.append(BatchResult(func(password, value, iterations), None))
+            except Exception as e:
+                results.append(BatchResult(None, e))
+        return results
+
+
+class BoundPBEStringEncryptor(object):
+    """
+    A StandardPBEStringEncryptor with a fixed, prepared password.
+    """
+
+    def __init__(self, encryptor, password):
+        """
+
+        :param encryptor: StandardPBEStringEncryptor - the encryptor to delegate to
+        :param password: str or PreparedPassword - the password used for the key material
+        """
+        self.encryptor = encryptor
+        self.password = password if isinstance(password, PreparedPassword) else PreparedPassword(password)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Zero the prepared password, the encryptor can not be used afterwards.
+        """
+        self.password.close()
 
-        cipher = self._cipher_factory(key, self._cipher_mode, iv)
+    def encrypt(self, text, iterations=1000):
+        return self.encryptor.encrypt(self.password, text, iterations)
 
-        # extract encrypted message bytes SALT_SIZE - len(cipher)
-        n_cipher_message = n_cipher_bytes[self.salt_generator.salt_block_size:]
+    def decrypt(self, ciphertext, iterations=1000):
+        return self.encryptor.decrypt(self.password, ciphertext, iterations)
 
-        # decode the message and unpad
-        decoded = cipher.decrypt(n_cipher_message)
+    def encrypt_many(self, values, iterations=1000, **kwargs):
+        return self.encryptor.encrypt_many(self.password, values, iterations, **kwargs)
 
-        return str_encode(self.unpad(decoded))
+    def decrypt_many(self, values, iterations=1000, **kwargs):
+        return self.encryptor.decrypt_many(self.password, values, iterations, **kwargs)
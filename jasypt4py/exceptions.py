@@ -4,4 +4,10 @@ from __future__ import (absolute_import, division, print_function)
 class ArgumentError(Exception):
     """A problem with the supplied arguments to a class or function
     """
-    pass
\ No newline at end of file
+    pass
+
+
+class AuthenticationError(ValueError):
+    """The tag of an authenticated cipher text does not match, the password is wrong or the data was modified
+    """
+    pass
@@ -1,15 +1,58 @@
 # Make coding more python3-ish
 from __future__ import (absolute_import, division, print_function)
 
+import binascii
+import hashlib
+import hmac
+import os
+import threading
+import weakref
 from abc import ABCMeta, abstractmethod
-from Crypto import Random
 
 from jasypt4py.exceptions import ArgumentError
+from jasypt4py.metrics import timer, KEY_DERIVATION, IV_DERIVATION, MAC_DERIVATION
 
 
 class PBEParameterGenerator(object):
     __metaclass__ = ABCMeta
 
+    # optional DerivationObserver notified of derivation timings
+    observer = None
+
+    def calibrate(self, min_time=0.1, cache=None):
+        """
+        Measure the key derivation cost of this generator on the current machine.
+
+        :param min_time: float - approximate seconds to spend measuring
+        :param cache: CalibrationCache or bool - cache to use, True for the default file, None to always measure
+        :return: Calibration with the per iteration and fixed cost in seconds
+        """
+        from jasypt4py.calibration import calibrate
+        return calibrate(self, min_time, cache)
+
+    def recommend_iterations(self, budget, min_time=0.1, cache=None):
+        """
+        :param budget: float - key derivation latency budget in seconds
+        :param min_time: float - approximate seconds to spend measuring if no cached calibration exists
+        :param cache: CalibrationCache or bool - cache to use, True for the default file, None (the default) to
+            always measure without writing a file
+        :return: int - the largest iteration count whose key derivation fits the budget
+        """
+        return self.calibrate(min_time, cache).iterations_for(budget)
+
+    def generate_derived_mac_key(self, password, salt, iterations, mac_size):
+        """
+        Generates the mac key alone, so a tag can be checked before the cipher parameters are derived.
+
+        :param password: str or PreparedPassword - the password used for the key material
+        :param salt: byte[] - random salt
+        :param iterations: int - number if hash iterations for key material
+        :param mac_size: int - size of the mac key in bytes
+        :return: the mac key, and the key and iv tuple if deriving the mac key produced them, None otherwise
+        """
+        derived = self.generate_derived_parameters(password, salt, iterations, mac_size=mac_size)
+        return derived[2], derived[:2]
+
     @staticmethod
     def adjust(a, a_off, b):
         """
@@ -48,6 +91,108 @@ class PBEParameterGenerator(object):
 
         return bytearray(pkcs12_pwd)
 
+    @staticmethod
+    def fill_block(data, block_size):
+        """
+        Repeats data to the next multiple of the block size as per PKCS12 steps 2 and 3.
+
+        :param data: byte[] - the salt or password bytes
+        :param block_size: int - the digest block size
+        :return: the concatenated copies of data truncated to a multiple of block_size
+        """
+        if not data:
+            return b''
+        size = len(data)
+        fill_size = block_size * ((size + block_size - 1) // block_size)
+        return (bytes(data) * (fill_size // size + 1))[:fill_size]
+
+    @staticmethod
+    def adjust_blocks(i_block, b, block_size):
+        """
+        Applies the PKCS12 adjust step to every block of I at once using integer arithmetic.
+
+        :param i_block: bytes - the concatenated S and P blocks
+        :param b: bytes - the block derived from A
+        :param block_size: int - the digest block size
+        :return: the adjusted I block
+        """
+        mask = (1 << (block_size * 8)) - 1
+        addend = _bytes_to_int(b) + 1
+        return b''.join(_int_to_bytes((_bytes_to_int(i_block[j:j + block_size]) + addend) & mask, block_size)
+                        for j in range(0, len(i_block), block_size))
+
+
+class PreparedPassword(object):
+    """
+    A password converted to PKCS12 bytes once, for processes that use the same password for every call.
+
+    Can be passed anywhere a password string is accepted. close() zeroes the held buffers; this is best effort as
+    the hash input passed to the digest is necessarily an immutable copy.
+    """
+
+    def __init__(self, password):
+        """
+
+        :param password: str - the password used for the key material
+        """
+        self._pkcs12_bytes = PBEParameterGenerator.pkcs12_password_to_bytes(password)
+        self._utf8_bytes = bytearray(password, 'utf-8')
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._pkcs12_bytes is None
+
+    @property
+    def pkcs12_bytes(self):
+        """
+        :return: bytearray - the pkcs12 padded password (unicode byte array with 2 trailing 0x0 bytes)
+        """
+        if self._pkcs12_bytes is None:
+            raise ValueError('prepared password has been closed')
+        return self._pkcs12_bytes
+
+    @property
+    def utf8_bytes(self):
+        """
+        :return: bytearray - the utf-8 encoded password as used by PBKDF2
+        """
+        if self._utf8_bytes is None:
+            raise ValueError('prepared password has been closed')
+        return self._utf8_bytes
+
+    def padded(self, block_size):
+        """
+        The password repeated to a multiple of the digest block size as per PKCS12 step 3.
+
+        :param block_size: int - the digest block size
+        :return: bytearray - the padded password block
+        """
+        block = self._blocks.get(block_size)
+        if block is None:
+            # setdefault keeps concurrent callers on the same block so close() zeroes every copy
+            block = self._blocks.setdefault(block_size,
+                                            bytearray(PBEParameterGenerator.fill_block(self.pkcs12_bytes, block_size)))
+        return block
+
+    def close(self):
+        """
+        Zero the held password bytes. Further use raises a ValueError.
+        """
+        if self._pkcs12_bytes is None:
+            return
+        for buf in [self._pkcs12_bytes, self._utf8_bytes] + list(self._blocks.values()):
+            buf[:] = bytearray(len(buf))
+        self._pkcs12_bytes = None
+        self._utf8_bytes = None
+        self._blocks = {}
+
 
 class PKCS12ParameterGenerator(PBEParameterGenerator):
     """
@@ -63,45 +208,145 @@ class PKCS12ParameterGenerator(PBEParameterGenerator):
     IV_MATERIAL = 2
     MAC_MATERIAL = 3
 
-    def __init__(self, digest_factory, key_size_bits=KEY_SIZE_256, iv_size_bits=DEFAULT_IV_SIZE):
+    MATERIAL_PHASES = {KEY_MATERIAL: KEY_DERIVATION, IV_MATERIAL: IV_DERIVATION, MAC_MATERIAL: MAC_DERIVATION}
+
+    def __init__(self, digest_factory, key_size_bits=KEY_SIZE_256, iv_size_bits=DEFAULT_IV_SIZE, backend=None):
         """
 
-        :param digest_factory: object - the digest algoritm to use (e.g. SHA256 or MD5)
+        :param digest_factory: object - the digest algoritm to use (e.g. SHA256 or MD5), or its name (e.g. sha256)
         :param key_size_bits: int - key size in bits
         :param iv_size_bits: int - iv size in bits
+        :param backend: str or CryptoBackend - backend resolving a digest name, defaults to hashlib
         """
         super(PKCS12ParameterGenerator, self).__init__()
+        if isinstance(digest_factory, str):
+            from jasypt4py.backend import get_backend
+            digest_factory = get_backend(backend or 'hashlib').digest(digest_factory)
         self.digest_factory = digest_factory
         self.key_size_bits = key_size_bits
         self.iv_size_bits = iv_size_bits
+        self._hash_new = _resolve_hash_new(digest_factory)
 
-    def generate_derived_parameters(self, password, salt, iterations=1000):
+    def generate_derived_parameters(self, password, salt, iterations=1000, mac_size=0):
         """
         Generates the key and iv that can be used with the cipher.
 
-        :param password: str - the password used for the key material
+        :param password: str or PreparedPassword - the password used for the key material
         :param salt: byte[] - random salt
         :param iterations: int - number if hash iterations for key material
+        :param mac_size: int - size in bytes of a mac key derived as MAC_MATERIAL in the same pass, 0 for none
 
-        :return: key and iv that can be used to setup the cipher
+        :return: key and iv that can be used to setup the cipher, followed by the mac key if mac_size is set
         """
         key_size = (self.key_size_bits // 8)
         iv_size = (self.iv_size_bits // 8)
 
         # pkcs12 padded password (unicode byte array with 2 trailing 0x0 bytes)
-        password_bytes = PKCS12ParameterGenerator.pkcs12_password_to_bytes(password)
+        if isinstance(password, PreparedPassword):
+            password_bytes = password
+        else:
+            password_bytes = PKCS12ParameterGenerator.pkcs12_password_to_bytes(password)
 
-        d_key = self.generate_derived_key(password_bytes, salt, iterations, self.KEY_MATERIAL, key_size)
+        materials = [(self.KEY_MATERIAL, key_size)]
         if iv_size and iv_size > 0:
-            d_iv = self.generate_derived_key(password_bytes, salt, iterations, self.IV_MATERIAL, iv_size)
-        else:
-            d_iv = None
-        return d_key, d_iv
+            materials.append((self.IV_MATERIAL, iv_size))
+        if mac_size:
+            materials.append((self.MAC_MATERIAL, mac_size))
+
+        derived = self.generate_derived_material(password_bytes, salt, iterations, materials)
+        if not iv_size or iv_size <= 0:
+            derived.insert(1, None)
+        return tuple(derived)
+
+    def generate_derived_mac_key(self, password, salt, iterations, mac_size):
+        """
+        Generates the MAC_MATERIAL alone, its hash chain is independent of the key and iv chains.
+
+        :return: the mac key and None as key and iv are not derived
+        """
+        if not isinstance(password, PreparedPassword):
+            password = PKCS12ParameterGenerator.pkcs12_password_to_bytes(password)
+        return self.generate_derived_material(password, salt, iterations, [(self.MAC_MATERIAL, mac_size)])[0], None
+
+    def generate_derived_material(self, password, salt, iterations, materials):
+        """
+        Generate several PKCS12 v1.0 derived keys (e.g. key, iv and mac material) from one salt and password,
+        building the shared S and P input block only once.
+
+        :param password: bytearray or PreparedPassword - pkcs12 padded password
+        :param salt: bytearray - random salt
+        :param iterations: int - number if hash iterations for key material
+        :param materials: list - (id_byte, size in bytes) pairs, e.g. ((KEY_MATERIAL, 32), (IV_MATERIAL, 16))
+        :return: a list with the derived bytes for each requested material in order
+        """
+        v = int(self.digest_factory.block_size)
+        I = self.fill_block(salt, v) + self._password_block(password, v)
+
+        observer = self.observer
+        if observer is None:
+            return [self._derive_from_block(I, iterations, id_byte, size) for id_byte, size in materials]
+
+        derived = []
+        for id_byte, size in materials:
+            started = timer()
+            derived.append(self._derive_from_block(I, iterations, id_byte, size))
+            observer.on_phase(self.MATERIAL_PHASES.get(id_byte, KEY_DERIVATION), timer() - started, iterations)
+        return derived
 
     def generate_derived_key(self, password, salt, iterations, id_byte, key_size):
         """
         Generate a derived key as per PKCS12 v1.0 spec
 
+        :param password: bytearray - pkcs12 padded password (unicode byte array with 2 trailing 0x0 bytes)
+        :param salt: bytearray - random salt
+        :param iterations: int - number if hash iterations for key material
+        :param id_byte: int - the material padding
+        :param key_size: int - the key size in bytes (e.g. AES is 256/8 = 32, IV is 128/8 = 16)
+        :return: the sha256 digested pkcs12 key
+        """
+        v = int(self.digest_factory.block_size)
+
+        # Step 2 - 4
+        I = self.fill_block(salt, v) + self._password_block(password, v)
+
+        return self._derive_from_block(I, iterations, id_byte, key_size)
+
+    def _password_block(self, password, v):
+        if isinstance(password, PreparedPassword):
+            return password.padded(v)
+        return self.fill_block(password, v)
+
+    def _derive_from_block(self, I, iterations, id_byte, key_size):
+        u = int(self.digest_factory.digest_size)
+        v = int(self.digest_factory.block_size)
+        hash_new = self._hash_new
+
+        # Step 1
+        D = bytes(bytearray([id_byte])) * v
+
+        # Step 5
+        c = ((key_size + u - 1) // u)
+
+        # Step 6
+        d_key = b''
+        for i in range(1, c + 1):
+            # Step 6 - a
+            A = hash_new(D + I).digest()
+            for _ in range(1, iterations):
+                A = hash_new(A).digest()
+            d_key += A
+
+            # Step 6 - b and c, only needed if another round follows
+            if i < c:
+                I = self.adjust_blocks(I, (A * (v // u + 1))[:v], v)
+
+        return d_key[:key_size]
+
+    def generate_derived_key_reference(self, password, salt, iterations, id_byte, key_size):
+        """
+        Byte by byte PKCS12 v1.0 key derivation mirroring Bouncycastle, kept for conformance checks of the fast
+        path in generate_derived_key.
+
         :param password: bytearray - pkcs12 padded password (unicode byte array with 2 trailing 0x0 bytes)
         :param salt: bytearray - random salt
         :param iterations: int - number if hash iterations for key material
@@ -181,6 +426,107 @@ class PKCS12ParameterGenerator(PBEParameterGenerator):
         return bytes(d_key)
 
 
+class PBKDF2ParameterGenerator(PBEParameterGenerator):
+    """
+    PBKDF2 key derivation as used by the Jasypt PBEWITHHMACSHA*ANDAES_* algorithms, backed by hashlib.pbkdf2_hmac.
+
+    The iv is not derived but comes from an IvGenerator, so generate_derived_parameters returns None for it.
+    """
+    __metaclass__ = ABCMeta
+
+    KEY_SIZE_256 = 256
+    KEY_SIZE_128 = 128
+
+    # HKDF info of the mac key expanded from the derived key
+    MAC_INFO = b'jasypt4py mac key'
+
+    def __init__(self, hash_name, key_size_bits=KEY_SIZE_256):
+        """
+
+        :param hash_name: str - the hmac digest name (e.g. sha512)
+        :param key_size_bits: int - key size in bits
+        """
+        super(PBKDF2ParameterGenerator, self).__init__()
+        # fail early on digests hashlib does not know
+        hashlib.new(hash_name)
+        self.hash_name = hash_name
+        self.key_size_bits = key_size_bits
+        self.iv_size_bits = 0
+
+    def generate_derived_parameters(self, password, salt, iterations=1000, mac_size=0):
+        """
+        Generates the key that can be used with the cipher.
+
+        :param password: str or PreparedPassword - the password used for the key material
+        :param salt: byte[] - random salt
+        :param iterations: int - number if hash iterations for key material
+        :param mac_size: int - size in bytes of a mac key expanded from the key, 0 for none
+
+        :return: key and None as the iv is generated separately, followed by the mac key if mac_size is set
+        """
+        if isinstance(password, PreparedPassword):
+            password_bytes = bytes(password.utf8_bytes)
+        else:
+            password_bytes = password.encode('utf-8')
+        observer = self.observer
+
+        started = timer() if observer is not None else 0
+        key = hashlib.pbkdf2_hmac(self.hash_name, password_bytes, bytes(salt), iterations, self.key_size_bits // 8)
+        if observer is not None:
+            observer.on_phase(KEY_DERIVATION, timer() - started, iterations)
+        if not mac_size:
+            return key, None
+
+        # PBKDF2 output beyond one digest costs a further full iteration chain, so the mac key is expanded from
+        # the derived key instead of requesting more output
+        started = timer() if observer is not None else 0
+        mac_key = _hkdf_expand(key, self.MAC_INFO, mac_size)
+        if observer is not None:
+            observer.on_phase(MAC_DERIVATION, timer() - started)
+        return key, None, mac_key
+
+
+def _hkdf_expand(prk, info, size):
+    """
+    HKDF-Expand as per RFC 5869 with HMAC-SHA256.
+
+    :param prk: bytes - the pseudorandom key
+    :param info: bytes - context binding the output to its use
+    :param size: int - the output size in bytes
+    :return: the expanded key
+    """
+    output = block = b''
+    for counter in range(1, -(-size // hashlib.sha256().digest_size) + 1):
+        block = hmac.new(prk, block + info + bytes(bytearray([counter])), hashlib.sha256).digest()
+        output += block
+    return output[:size]
+
+
+def _resolve_hash_new(digest_factory):
+    """
+    Find a hashlib constructor equivalent to the digest factory, falling back to the factory itself.
+
+    :param digest_factory: object - the digest algorithm module (e.g. Crypto.Hash.SHA256)
+    :return: a callable taking the initial data and returning a hash object
+    """
+    name = getattr(digest_factory, '__name__', '').rsplit('.', 1)[-1].lower()
+    try:
+        hash_new = getattr(hashlib, name)
+        if hash_new().digest_size == digest_factory.digest_size:
+            return hash_new
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return digest_factory.new
+
+
+if hasattr(int, 'from_bytes'):
+    _bytes_to_int = lambda b: int.from_bytes(b, 'big')
+    _int_to_bytes = lambda x, size: x.to_bytes(size, 'big')
+else:
+    _bytes_to_int = lambda b: int(binascii.hexlify(b), 16)
+    _int_to_bytes = lambda x, size: binascii.unhexlify('%0*x' % (size * 2, x))
+
+
 class SaltGenerator(object):
     """
     Base for a salt generator
@@ -211,7 +557,58 @@ class RandomSaltGenerator(SaltGenerator):
         super(RandomSaltGenerator, self).__init__(salt_block_size)
 
     def generate_salt(self):
-        return bytearray(Random.get_random_bytes(self.salt_block_size))
+        return bytearray(os.urandom(self.salt_block_size))
+
+
+class BufferedRandomSaltGenerator(SaltGenerator):
+    """
+    A random salt generator that reads the operating system CSPRNG in large blocks and slices salts from them.
+
+    Safe to share between threads, and a forked child process refills the buffer instead of repeating the
+    salts of its parent.
+    """
+    __metaclass__ = ABCMeta
+
+    DEFAULT_BUFFER_SIZE = 4096
+
+    def __init__(self, salt_block_size=SaltGenerator.DEFAULT_SALT_SIZE_BYTE, buffer_size=DEFAULT_BUFFER_SIZE,
+                 **kwargs):
+        """
+
+        :param salt_block_size: the salt block size in bytes
+        :param buffer_size: number of random bytes fetched at a time
+        """
+        super(BufferedRandomSaltGenerator, self).__init__(salt_block_size)
+        if buffer_size < salt_block_size:
+            raise ArgumentError('buffer_size must be at least the salt block size')
+        self.buffer_size = buffer_size
+        self._reset()
+        _buffered_salt_generators.add(self)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._buffer = b''
+        self._offset = 0
+        self._pid = os.getpid()
+
+    def generate_salt(self):
+        size = self.salt_block_size
+        with self._lock:
+            # the pid check covers platforms without os.register_at_fork
+            if self._offset + size > len(self._buffer) or self._pid != os.getpid():
+                self._buffer = os.urandom(self.buffer_size - self.buffer_size % size)
+                self._offset = 0
+                self._pid = os.getpid()
+            salt = self._buffer[self._offset:self._offset + size]
+            self._offset += size
+        return salt
+
+
+_buffered_salt_generators = weakref.WeakSet()
+
+if hasattr(os, 'register_at_fork'):
+    # discard inherited random bytes and locks possibly held by other threads at fork time
+    os.register_at_fork(after_in_child=lambda: [g._reset() for g in list(_buffered_salt_generators)])
 
 
 class FixedSaltGenerator(SaltGenerator):
@@ -238,3 +635,64 @@ class FixedSaltGenerator(SaltGenerator):
 
     def generate_salt(self):
         return self.salt
+
+
+class IvGenerator(object):
+    """
+    Base for an iv generator, used by algorithms that do not derive the iv from the password
+    """
+    __metaclass__ = ABCMeta
+
+    DEFAULT_IV_SIZE_BYTE = 16
+
+    def __init__(self, iv_block_size=DEFAULT_IV_SIZE_BYTE):
+        self.iv_block_size = iv_block_size
+
+    @abstractmethod
+    def generate_iv(self):
+        pass
+
+
+class RandomIvGenerator(IvGenerator):
+    """
+    A random iv generator, equivalent of the Jasypt RandomIvGenerator
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, iv_block_size=IvGenerator.DEFAULT_IV_SIZE_BYTE, **kwargs):
+        """
+
+        :param iv_block_size: the iv block size in bytes
+        """
+        super(RandomIvGenerator, self).__init__(iv_block_size)
+
+    def generate_iv(self):
+        return bytearray(os.urandom(self.iv_block_size))
+
+
+class FixedIvGenerator(IvGenerator):
+    """
+    A fixed iv generator, only useful for tests and reproducible output
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, iv_block_size=IvGenerator.DEFAULT_IV_SIZE_BYTE, iv=None, **kwargs):
+        """
+
+        :param iv_block_size: the iv block size in bytes
+        """
+        super(FixedIvGenerator, self).__init__(iv_block_size)
+        if not iv:
+            raise ArgumentError('iv not provided')
+        # ensure supplied type matches
+        if isinstance(iv, str):
+            self.iv = bytearray(iv, 'utf-8')
+        elif isinstance(iv, bytearray):
+            self.iv = iv
+        else:
+            raise TypeError('iv must either be a string or bytearray but not %s' % type(iv))
+        if len(self.iv) != iv_block_size:
+            raise ArgumentError('iv must be %d bytes long' % iv_block_size)
+
+    def generate_iv(self):
+        return self.iv
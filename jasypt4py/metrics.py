@@ -0,0 +1,139 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+import threading
+import time
+
+# high resolution timer used for all phase timings
+timer = getattr(time, 'perf_counter', time.time)
+
+SALT_GENERATION = 'salt_generation'
+KEY_DERIVATION = 'key_derivation'
+IV_DERIVATION = 'iv_derivation'
+MAC_DERIVATION = 'mac_derivation'
+CIPHER = 'cipher'
+ENCODING = 'encoding'
+
+
+class DerivationObserver(object):
+    """
+    Receives timings from StandardPBEStringEncryptor and the parameter generators.
+
+    Override the callbacks of interest, the defaults do nothing.
+    """
+
+    def on_phase(self, phase, seconds, iterations=None):
+        """
+        Called after a phase completed.
+
+        :param phase: str - one of the phase constants of this module, e.g. KEY_DERIVATION
+        :param seconds: float - the duration of the phase
+        :param iterations: int - the hash iterations for derivation phases, None otherwise
+        """
+        pass
+
+    def on_cache(self, hit):
+        """
+        Called after a derived key cache lookup.
+
+        :param hit: bool - True if the derived parameters were cached
+        """
+        pass
+
+
+class MetricsCollector(DerivationObserver):
+    """
+    An in-memory observer keeping counts, cumulative time and a latency histogram per phase.
+    """
+
+    DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+
+        :param buckets: tuple - ascending histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._phases = {}
+            self._iterations = {}
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def on_phase(self, phase, seconds, iterations=None):
+        with self._lock:
+            stats = self._phases.get(phase)
+            if stats is None:
+                stats = self._phases[phase] = {'count': 0, 'sum': 0.0, 'buckets': [0] * (len(self.buckets) + 1)}
+            stats['count'] += 1
+            stats['sum'] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats['buckets'][i] += 1
+                    break
+            else:
+                stats['buckets'][-1] += 1
+            if phase == KEY_DERIVATION and iterations is not None:
+                self._iterations[iterations] = self._iterations.get(iterations, 0) + 1
+
+    def on_cache(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    @property
+    def cache_hit_rate(self):
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        """
+        :return: dict - phases with count, sum and cumulative histogram, iteration counts and cache statistics
+        """
+        with self._lock:
+            phases = {}
+            for phase, stats in self._phases.items():
+                cumulative, histogram = 0, []
+                for bound, count in zip(self.buckets + (float('inf'),), stats['buckets']):
+                    cumulative += count
+                    histogram.append((bound, cumulative))
+                phases[phase] = {'count': stats['count'], 'sum': stats['sum'], 'histogram': histogram}
+            return {
+                'phases': phases,
+                'iterations': dict(self._iterations),
+                'cache': {'hits': self.cache_hits, 'misses': self.cache_misses, 'hit_rate': self.cache_hit_rate},
+            }
+
+    def to_prometheus(self, prefix='jasypt4py'):
+        """
+        :param prefix: str - metric name prefix
+        :return: str - the metrics in the Prometheus text exposition format
+        """
+        metrics = self.as_dict()
+        lines = ['# HELP %s_phase_seconds Time spent per encryption phase.' % prefix,
+                 '# TYPE %s_phase_seconds histogram' % prefix]
+        for phase in sorted(metrics['phases']):
+            stats = metrics['phases'][phase]
+            for bound, count in stats['histogram']:
+                lines.append('%s_phase_seconds_bucket{phase="%s",le="%s"} %d' % (
+                    prefix, phase, '+Inf' if bound == float('inf') else repr(bound), count))
+            lines.append('%s_phase_seconds_sum{phase="%s"} %r' % (prefix, phase, stats['sum']))
+            lines.append('%s_phase_seconds_count{phase="%s"} %d' % (prefix, phase, stats['count']))
+
+        lines += ['# HELP %s_derivations_total Key derivations per iteration count.' % prefix,
+                  '# TYPE %s_derivations_total counter' % prefix]
+        for iterations in sorted(metrics['iterations']):
+            lines.append('%s_derivations_total{iterations="%d"} %d' % (prefix, iterations,
+                                                                       metrics['iterations'][iterations]))
+
+        lines += ['# HELP %s_cache_lookups_total Derived key cache lookups.' % prefix,
+                  '# TYPE %s_cache_lookups_total counter' % prefix,
+                  '%s_cache_lookups_total{result="hit"} %d' % (prefix, metrics['cache']['hits']),
+                  '%s_cache_lookups_total{result="miss"} %d' % (prefix, metrics['cache']['misses'])]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,163 @@
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+
+from base64 import b64encode, b64decode
+
+from jasypt4py.backend import AES_BLOCK_SIZE
+from jasypt4py.exceptions import ArgumentError
+
+
+class _Base64Writer(object):
+    """
+    Base64 encodes written bytes in 3 byte groups, holding back the remainder until close.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self._pending = b''
+
+    def write(self, data):
+        data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self._pending = data[cut:]
+        if cut:
+            self.target.write(b64encode(data[:cut]))
+
+    def close(self):
+        if self._pending:
+            self.target.write(b64encode(self._pending))
+            self._pending = b''
+
+
+class _Base64Reader(object):
+    """
+    Decodes base64 from a byte stream in 4 character groups, skipping line breaks and other whitespace.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._pending = b''
+        self._decoded = b''
+        self._eof = False
+
+    def read(self, size):
+        while len(self._decoded) < size and not self._eof:
+            data = self.source.read(size)
+            if not data:
+                self._eof = True
+                data = self._pending
+                self._pending = b''
+            else:
+                data = self._pending + b''.join(data.split())
+                cut = len(data) - len(data) % 4
+                data, self._pending = data[:cut], data[cut:]
+            if data:
+                self._decoded += b64decode(data)
+        data, self._decoded = self._decoded[:size], self._decoded[size:]
+        return data
+
+
+class PBEStreamEncryptor(object):
+    """
+    Streaming counterpart of StandardPBEStringEncryptor for large payloads.
+
+    Reads from and writes to binary file-like objects in fixed-size chunks, deriving key and iv once from the
+    salt (and plain iv) header. The output uses the same salt + cipher text layout as
+    StandardPBEStringEncryptor.encrypt so small payloads can be decrypted with either class.
+    """
+
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, encryptor, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+
+        :param encryptor: StandardPBEStringEncryptor - provides salt generator, key derivation and cipher
+        :param chunk_size: int - number of bytes read per chunk, rounded down to the cipher block size
+        """
+        if chunk_size < AES_BLOCK_SIZE:
+            raise ArgumentError('chunk_size must be at least %d bytes' % AES_BLOCK_SIZE)
+        if encryptor.authenticated:
+            # the tag can only be checked after the whole stream was read
+            raise NotImplementedError('Authenticated mode is not implemented for streams')
+        self.encryptor = encryptor
+        self.chunk_size = chunk_size - chunk_size % AES_BLOCK_SIZE
+
+    def encrypt(self, password, source, target, iterations=1000, base64_output=False):
+        """
+        Encrypt a binary stream.
+
+        :param password: str - the password used for the key material
+        :param source: file - binary file-like object to read plain text from
+        :param target: file - binary file-like object to write salt + cipher text to
+        :param iterations: int - number of hash iterations for key material
+        :param base64_output: bool - base64 encode the output as StandardPBEStringEncryptor.encrypt does
+        """
+        writer = _Base64Writer(target) if base64_output else target
+
+        salt = bytes(self.encryptor.salt_generator.generate_salt())
+        iv = bytes(self.encryptor.iv_generator.generate_iv()) if self.encryptor.iv_generator is not None else b''
+        cipher = self.encryptor.new_cipher(password, salt, iterations, iv)
+        writer.write(salt + iv)
+
+        pending = b''
+        while True:
+            data = source.read(self.chunk_size)
+            if not data:
+                break
+            data = pending + data
+            cut = len(data) - len(data) % AES_BLOCK_SIZE
+            pending = data[cut:]
+            if cut:
+                writer.write(cipher.encrypt(data[:cut]))
+
+        # pad only the final block
+        writer.write(cipher.encrypt(self.encryptor.pad(AES_BLOCK_SIZE, pending)))
+
+        if base64_output:
+            writer.close()
+
+    def decrypt(self, password, source, target, iterations=1000, base64_input=False):
+        """
+        Decrypt a binary stream.
+
+        :param password: str - the password used for the key material
+        :param source: file - binary file-like object to read salt + cipher text from
+        :param target: file - binary file-like object to write the plain text to
+        :param iterations: int - number of hash iterations for key material
+        :param base64_input: bool - the input is base64 encoded as produced by StandardPBEStringEncryptor.encrypt
+        """
+        reader = _Base64Reader(source) if base64_input else source
+
+        salt_size = self.encryptor.salt_generator.salt_block_size
+        header = self._read_exactly(reader, salt_size + self.encryptor.iv_block_size)
+        if len(header) != salt_size + self.encryptor.iv_block_size:
+            raise ValueError('input is shorter than the %d byte header' % (salt_size + self.encryptor.iv_block_size))
+        cipher = self.encryptor.new_cipher(password, header[:salt_size], iterations, header[salt_size:])
+
+        # the last block is held back until the end of input to remove the padding
+        pending = b''
+        while True:
+            data = reader.read(self.chunk_size)
+            if not data:
+                break
+            data = pending + data
+            cut = len(data) - len(data) % AES_BLOCK_SIZE
+            if cut == len(data):
+                cut -= AES_BLOCK_SIZE
+            pending = data[cut:]
+            if cut:
+                target.write(cipher.decrypt(data[:cut]))
+
+        if len(pending) != AES_BLOCK_SIZE:
+            raise ValueError('cipher text is not a multiple of the %d byte block size' % AES_BLOCK_SIZE)
+        target.write(self.encryptor.unpad(cipher.decrypt(pending)))
+
+    @staticmethod
+    def _read_exactly(reader, size):
+        data = b''
+        while len(data) < size:
+            chunk = reader.read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
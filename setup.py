@@ -69,7 +69,7 @@ setup(
         'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
 
-        # works on anything that can run pycrypto
+        # works on anything that can run pycryptodome or cryptography
         'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3'
@@ -78,9 +78,21 @@ setup(
     keywords='jasypt bouncycastle AES crypto SHA256',
 
     install_requires=[
-        'pycrypto'
+        'pycryptodome'
     ],
 
+    # optional extras: the faster OpenSSL based cipher backend and configuration formats
+    extras_require={
+        'cryptography': ['cryptography'],
+        'yaml': ['PyYAML']
+    },
+
+    entry_points={
+        'console_scripts': [
+            'jasypt4py=jasypt4py.cli:main'
+        ]
+    },
+
     # prepare for testing with nose
     test_suite='nose.collector',
     tests_require=[
@@ -90,8 +102,18 @@ setup(
     # manually define packages
     py_modules=[
         'jasypt4py.exceptions',
+        'jasypt4py.metrics',
+        'jasypt4py.backend',
+        'jasypt4py.cache',
         'jasypt4py.generator',
-        'jasypt4py.encryptor'
+        'jasypt4py.algorithm',
+        'jasypt4py.calibration',
+        'jasypt4py.encryptor',
+        'jasypt4py.stream',
+        'jasypt4py.bulk',
+        'jasypt4py.config',
+        'jasypt4py.cli',
+        'jasypt4py.aio'
     ]
 
 )
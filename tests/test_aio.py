@@ -0,0 +1,104 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from jasypt4py.aio import AsyncPBEStringEncryptor
+from jasypt4py.metrics import MetricsCollector
+
+
+class TestAsyncPBEStringEncryptor(unittest.TestCase):
+    def test_encrypt_decrypt(self):
+        async def run():
+            async with AsyncPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', concurrency=2) as jasypt:
+                encrypted = await jasypt.encrypt('pwd', 'secret value', 100)
+                return await jasypt.decrypt('pwd', encrypted, 100)
+
+        self.assertEqual('secret value', asyncio.run(run()))
+
+    def test_coalesce_duplicate_decrypt(self):
+        async def run():
+            async with AsyncPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                               salt_generator='Fixed',
+                                               salt='0123456789ABCDEF') as jasypt:
+                ciphertext = 'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o='
+                first = jasypt.decrypt('pssst...don\'t tell anyone', ciphertext, 4000)
+                second = jasypt.decrypt('pssst...don\'t tell anyone', ciphertext, 4000)
+                first, second = asyncio.ensure_future(first), asyncio.ensure_future(second)
+                await asyncio.sleep(0)
+                in_flight = len(jasypt._in_flight)
+                return in_flight, await first, await second, len(jasypt._in_flight)
+
+        in_flight, first, second, remaining = asyncio.run(run())
+
+        self.assertEqual(1, in_flight, 'expect duplicate requests to share one derivation')
+        self.assertEqual(('secret value', 'secret value'), (first, second))
+        self.assertEqual(0, remaining, 'expect completed requests to be released')
+
+    def test_iter_decrypt_reports_errors(self):
+        async def run():
+            async with AsyncPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC') as jasypt:
+                encrypted = await jasypt.encrypt('pwd', 'secret value', 10)
+                return [r async for r in jasypt.iter_decrypt('pwd', [encrypted, 'not base64!'], 10)]
+
+        results = asyncio.run(run())
+
+        self.assertEqual('secret value', results[0].value)
+        self.assertIsNotNone(results[1].error)
+
+    def test_default_process_pool_keeps_loop_responsive(self):
+        metrics = MetricsCollector()
+
+        async def run():
+            async with AsyncPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', observer=metrics) as jasypt:
+                self.assertIsInstance(jasypt._executor, ProcessPoolExecutor)
+                encrypted = await jasypt.encrypt('pwd', 'secret value', 20000)
+                lag, done = [0.0], []
+
+                async def tick():
+                    while not done:
+                        started = time.perf_counter()
+                        await asyncio.sleep(0.001)
+                        lag[0] = max(lag[0], time.perf_counter() - started - 0.001)
+
+                ticker = asyncio.ensure_future(tick())
+                values = await asyncio.gather(*[jasypt.decrypt('pwd', encrypted, 20000) for _ in range(2)],
+                                              *[jasypt.decrypt('pwd', encrypted, 20000 + i) for i in range(1, 7)],
+                                              return_exceptions=True)
+                done.append(True)
+                await ticker
+                return values, lag[0]
+
+        values, lag = asyncio.run(run())
+
+        self.assertEqual(['secret value', 'secret value'], values[:2])
+        self.assertLess(lag, 0.05, 'expect derivation in worker processes not to stall the event loop')
+        self.assertEqual(8, metrics.as_dict()['phases']['key_derivation']['count'],
+                         'expect worker phases to be reported')
+
+    def test_iter_keeps_a_bounded_window(self):
+        in_flight, peak = [0], [0]
+
+        async def run():
+            async with AsyncPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC', concurrency=2,
+                                               executor=ThreadPoolExecutor(2)) as jasypt:
+                async def encrypt(password, text, iterations):
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                    try:
+                        return await AsyncPBEStringEncryptor.encrypt(jasypt, password, text, iterations)
+                    finally:
+                        in_flight[0] -= 1
+
+                jasypt.encrypt = encrypt
+                return [r async for r in jasypt.iter_encrypt('pwd', ('value %d' % i for i in range(50)), 10)]
+
+        results = asyncio.run(run())
+
+        self.assertEqual(50, len(results))
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertLessEqual(peak[0], 4, 'expect at most two values per worker in flight')
+
+
+if __name__ == '__main__':
+    unittest.main()
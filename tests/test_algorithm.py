@@ -0,0 +1,54 @@
+import copy
+import pickle
+import unittest
+
+from jasypt4py.algorithm import ALGORITHMS, LAYOUT_SALT_IV, PBEAlgorithm, get_algorithm, register_algorithm
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.exceptions import ArgumentError
+from jasypt4py.metrics import MetricsCollector
+
+
+class TestAlgorithmRegistry(unittest.TestCase):
+    def tearDown(self):
+        ALGORITHMS.pop('PBEWITHSHA256AND192BITAES-CBC', None)
+
+    def test_jasypt_algorithms(self):
+        self.assertEqual(12, len(ALGORITHMS))
+        self.assertEqual(LAYOUT_SALT_IV, get_algorithm('PBEWITHHMACSHA384ANDAES_128').layout)
+        self.assertEqual(128, get_algorithm('PBEWITHHMACSHA384ANDAES_128').key_size_bits)
+
+    def test_register_custom_algorithm(self):
+        register_algorithm(PBEAlgorithm('PBEWITHSHA256AND192BITAES-CBC', 'sha256', 192))
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND192BITAES-CBC')
+
+        self.assertEqual(24, len(jasypt.key_generator.generate_derived_parameters('password', b'salt', 10)[0]))
+        self.assertEqual('secret value', jasypt.decrypt('password', jasypt.encrypt('password', 'secret value', 10),
+                                                        10))
+        with self.assertRaises(ArgumentError):
+            register_algorithm(PBEAlgorithm('PBEWITHSHA256AND192BITAES-CBC', 'sha256', 192))
+
+    def test_descriptors_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            get_algorithm('PBEWITHSHA256AND256BITAES-CBC').key_size_bits = 128
+
+    def test_pickle_and_copy(self):
+        algorithm = get_algorithm('PBEWITHHMACSHA512ANDAES_256')
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        encrypted = jasypt.encrypt('password', 'secret value', 10)
+
+        for clone in (copy.copy, copy.deepcopy, lambda o: pickle.loads(pickle.dumps(o))):
+            self.assertEqual(repr(algorithm), repr(clone(algorithm)))
+            self.assertEqual('secret value', clone(jasypt).decrypt('password', encrypted, 10))
+
+    def test_key_generator_is_shared(self):
+        first = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        second = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        observed = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', observer=MetricsCollector())
+
+        self.assertIs(first.key_generator, second.key_generator)
+        self.assertIsNot(first.key_generator, observed.key_generator)
+        self.assertIsNone(first.key_generator.observer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import unittest
+
+from jasypt4py.backend import AES_BLOCK_SIZE, BACKENDS, CryptographyBackend, HashlibBackend, PycryptodomeBackend, \
+    get_backend
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.generator import PKCS12ParameterGenerator
+from jasypt4py.metrics import MetricsCollector
+
+CIPHER_BACKENDS = [b.name for b in BACKENDS if b.ciphers and b.available()]
+
+
+class TestCryptoBackend(unittest.TestCase):
+    def test_backends_produce_identical_output(self):
+        pwd = 'pssst...don\'t tell anyone'
+        for name in CIPHER_BACKENDS:
+            jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                                salt_generator='Fixed',
+                                                salt='0123456789ABCDEF',
+                                                backend=name)
+
+            self.assertEqual(name, jasypt.backend.name)
+            self.assertEqual('MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', jasypt.encrypt(pwd, 'secret value', 4000),
+                             'expected fixed crypted result from %s' % name)
+
+    def test_cross_backend_decrypt(self):
+        pwd = 'pssst...don\'t tell anyone'
+        message = 'secret value ' * 10
+        for source in CIPHER_BACKENDS:
+            encrypted = StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC', backend=source).encrypt(
+                pwd, message, 10)
+            for target in CIPHER_BACKENDS:
+                self.assertEqual(message, StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC',
+                                                                     backend=target).decrypt(pwd, encrypted, 10),
+                                 'expect %s output to decrypt with %s' % (source, target))
+
+    def test_truncated_cipher_text_rejected(self):
+        for name in CIPHER_BACKENDS:
+            jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC', backend=name)
+            encrypted = jasypt.encrypt_bytes('password', b'secret value ' * 3, 10)
+
+            for size in (len(encrypted) - 3, len(encrypted) - 15, 16):
+                with self.assertRaises(ValueError, msg='expect %d bytes to be rejected by %s' % (size, name)):
+                    jasypt.decrypt_bytes('password', encrypted[:size], 10)
+
+    def test_truncated_header_rejected_before_derivation(self):
+        for name in CIPHER_BACKENDS:
+            for algorithm in ('PBEWITHHMACSHA512ANDAES_256', 'PBEWITHSHA256AND128BITAES-CBC'):
+                metrics = MetricsCollector()
+                jasypt = StandardPBEStringEncryptor(algorithm, backend=name, observer=metrics)
+                encrypted = jasypt.encrypt_bytes('password', b'secret value', 10)
+                metrics.reset()
+
+                for size in (0, 16, 20, len(encrypted) - AES_BLOCK_SIZE):
+                    with self.assertRaises(ValueError, msg='expect %d bytes of %s to be rejected by %s' % (
+                            size, algorithm, name)):
+                        jasypt.decrypt_bytes('password', encrypted[:size], 10)
+                self.assertEqual({}, metrics.as_dict()['phases'], 'expect no key derivation for truncated input')
+
+    def test_derivation_identical_across_backends(self):
+        salt = bytearray(os.urandom(16))
+        expected = PKCS12ParameterGenerator('sha256').generate_derived_parameters('password', salt, 10)
+
+        for backend in [b.name for b in BACKENDS if b.available()]:
+            self.assertEqual(expected, PKCS12ParameterGenerator('sha256', backend=backend).generate_derived_parameters(
+                'password', salt, 10), 'expect identical derivation with %s' % backend)
+
+    def test_backend_override(self):
+        os.environ['JASYPT4PY_BACKEND'] = 'hashlib'
+        try:
+            self.assertIsInstance(get_backend(), HashlibBackend)
+        finally:
+            del os.environ['JASYPT4PY_BACKEND']
+        self.assertIsInstance(get_backend(), (CryptographyBackend, PycryptodomeBackend))
+
+    def test_invalid_backend(self):
+        with self.assertRaises(NotImplementedError) as context:
+            get_backend('rot13')
+
+        self.assertEqual('Backend rot13 is not implemented', str(context.exception))
+
+    def test_backend_without_ciphers(self):
+        with self.assertRaises(NotImplementedError) as context:
+            StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', backend='hashlib')
+
+        self.assertEqual('Backend hashlib does not provide ciphers, select cryptography or pycryptodome',
+                         str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from jasypt4py.cache import DerivedKeyCache
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.metrics import MetricsCollector
+
+
+class TestBatchEncryptor(unittest.TestCase):
+    def test_encrypt_decrypt_many_in_process(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC')
+        pwd = 'pssst...don\'t tell anyone'
+        messages = ['secret value %d' % i for i in range(10)]
+
+        encrypted = jasypt.encrypt_many(pwd, messages, 100, workers=1, chunk_size=3)
+        decrypted = jasypt.decrypt_many(pwd, [r.value for r in encrypted], 100, workers=1, chunk_size=3)
+
+        self.assertEqual(messages, [r.value for r in decrypted], 'expect results in input order')
+        self.assertTrue(all(r.error is None for r in encrypted + decrypted))
+
+    def test_decrypt_many_with_process_pool(self):
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF')
+        pwd = 'pssst...don\'t tell anyone'
+        values = ['MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 'not base64!',
+                  'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=']
+
+        results = jasypt.decrypt_many(pwd, values, 4000, workers=2, chunk_size=1)
+
+        self.assertEqual(['secret value', None, 'secret value'], [r.value for r in results])
+        self.assertIsNone(results[0].error)
+        self.assertIsNotNone(results[1].error, 'expect the failed item to report its error')
+
+    def test_cache_and_metrics_with_process_pool(self):
+        cache = DerivedKeyCache()
+        metrics = MetricsCollector()
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF',
+                                            key_cache=cache,
+                                            observer=metrics)
+        pwd = 'pssst...don\'t tell anyone'
+        jasypt.decrypt(pwd, 'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 4000)
+
+        results = jasypt.decrypt_many(pwd, ['MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o='] * 4, 4000, workers=2,
+                                      chunk_size=2)
+
+        self.assertEqual(['secret value'] * 4, [r.value for r in results])
+        self.assertEqual((4, 1), (cache.hits, cache.misses), 'expect workers to hit the cached parameters')
+        self.assertEqual((4, 1), (metrics.cache_hits, metrics.cache_misses))
+        self.assertEqual(5, metrics.as_dict()['phases']['cipher']['count'], 'expect worker phases to be reported')
+
+        # parameters derived by workers are added to the cache of the calling process
+        cache.clear()
+        jasypt.encrypt_many(pwd, ['a', 'b'], 10, workers=2, chunk_size=1)
+        self.assertEqual(1, len(cache))
+        self.assertEqual(2, cache.hits + cache.misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
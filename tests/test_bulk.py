@@ -0,0 +1,94 @@
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+from jasypt4py.bulk import PBEBulkDecryptor
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+
+
+class TestPBEBulkDecryptor(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dump.txt')
+        self.encryptor = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        self.password = 'pssst...don\'t tell anyone'
+
+        # short values and some longer than the mmap window
+        self.values = ['value %d' % i for i in range(200)]
+        self.values[10] = 'x' * (3 * mmap.ALLOCATIONGRANULARITY)
+        self.values[150] = 'y' * mmap.ALLOCATIONGRANULARITY
+        with open(self.path, 'w') as f:
+            for value in self.values:
+                f.write(self.encryptor.encrypt(self.password, value, 10) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_decrypt(self):
+        bulk = PBEBulkDecryptor(self.encryptor, window_size=mmap.ALLOCATIONGRANULARITY)
+        target = io.BytesIO()
+        values = []
+
+        progress = bulk.decrypt(self.password, self.path, target, callback=lambda r: values.append(bytes(r.value)),
+                                iterations=10)
+
+        self.assertEqual(''.join(v + '\n' for v in self.values), target.getvalue().decode('utf-8'))
+        self.assertEqual([v.encode('utf-8') for v in self.values], values)
+        self.assertEqual((200, 0, os.path.getsize(self.path)), progress)
+
+    def test_decode_in_slices_with_one_write_per_record(self):
+        bulk = PBEBulkDecryptor(self.encryptor)
+        bulk.DECODE_CHUNK = 64
+        writes = []
+
+        class Target(object):
+            def write(self, data):
+                writes.append(bytes(data))
+
+        progress = bulk.decrypt(self.password, self.path, Target(), iterations=10)
+
+        self.assertEqual((200, 0), progress[:2])
+        self.assertEqual([v.encode('utf-8') + b'\n' for v in self.values], writes)
+
+    def test_resume(self):
+        bulk = PBEBulkDecryptor(self.encryptor, window_size=mmap.ALLOCATIONGRANULARITY)
+        offsets = list(bulk.offsets(self.path))
+        target = io.BytesIO()
+
+        first = bulk.decrypt(self.password, self.path, target, iterations=10, end=offsets[120])
+        second = bulk.decrypt(self.password, self.path, target, iterations=10, start=first.offset)
+
+        self.assertEqual((120, offsets[120]), first[::2])
+        self.assertEqual(80, second.records)
+        self.assertEqual(''.join(v + '\n' for v in self.values), target.getvalue().decode('utf-8'))
+
+    def test_random_access(self):
+        bulk = PBEBulkDecryptor(self.encryptor)
+        offsets = list(bulk.offsets(self.path))
+
+        self.assertEqual(200, len(offsets))
+        for i in (0, 10, 150, 199):
+            self.assertEqual(self.values[i].encode('utf-8'), bulk.decrypt_record(self.password, self.path, offsets[i],
+                                                                                 10))
+
+    def test_errors_keep_lines_aligned(self):
+        with open(self.path, 'w') as f:
+            f.write(self.encryptor.encrypt(self.password, 'first', 10) + '\nnot a cipher text\n' +
+                    self.encryptor.encrypt(self.password, 'last', 10))
+        bulk = PBEBulkDecryptor(self.encryptor)
+        target = io.BytesIO()
+        errors = []
+
+        progress = bulk.decrypt(self.password, self.path, target, callback=lambda r: errors.append(r.error),
+                                iterations=10)
+
+        self.assertEqual(b'first\nnot a cipher text\nlast\n', target.getvalue())
+        self.assertEqual((3, 1), progress[:2])
+        self.assertIsNotNone(errors[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
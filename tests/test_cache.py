@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+
+from jasypt4py.cache import DerivedKeyCache
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.exceptions import ArgumentError
+
+
+class TestDerivedKeyCache(unittest.TestCase):
+    def test_cached_decrypt_with_fixed_salt(self):
+        cache = DerivedKeyCache(max_size=8)
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF',
+                                            key_cache=cache)
+        pwd = 'pssst...don\'t tell anyone'
+
+        for _ in range(3):
+            decrypted_message = jasypt.decrypt(pwd, 'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 4000)
+            self.assertEqual('secret value', decrypted_message, 'expect cached parameters to decrypt')
+
+        self.assertEqual(1, cache.misses, 'expect a single derivation')
+        self.assertEqual(2, cache.hits, 'expect repeated salts to hit the cache')
+
+    def test_password_not_held_in_cache(self):
+        cache = DerivedKeyCache()
+        key = cache.cache_key('pssst', bytearray(b'0123456789ABCDEF'), 1000)
+
+        self.assertFalse(b'pssst' in key, 'expect the password to be digested')
+        self.assertNotEqual(key, DerivedKeyCache().cache_key('pssst', bytearray(b'0123456789ABCDEF'), 1000),
+                            'expect the digest to be keyed per cache')
+        self.assertNotEqual(key, cache.cache_key('pssst', bytearray(b'0123456789ABCDEF'), 1001),
+                            'expect iterations to be part of the key')
+
+    def test_lru_eviction(self):
+        cache = DerivedKeyCache(max_size=2)
+        derive = lambda p, s, i: (bytes(s), None)
+
+        cache.get_or_derive('pwd', b'a', 1, derive)
+        cache.get_or_derive('pwd', b'b', 1, derive)
+        cache.get_or_derive('pwd', b'a', 1, derive)
+        cache.get_or_derive('pwd', b'c', 1, derive)
+
+        self.assertEqual(2, len(cache))
+        self.assertFalse(cache.invalidate('pwd', b'b', 1), 'expect least recently used entry to be evicted')
+        self.assertTrue(cache.invalidate('pwd', b'a', 1), 'expect recently used entry to be kept')
+
+    def test_ttl_expiry(self):
+        cache = DerivedKeyCache(ttl=0.01)
+        key = cache.cache_key('pwd', b'salt', 1)
+        cache.put(key, (b'key', b'iv'))
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get(key), 'expect expired entry to be dropped')
+        self.assertEqual(0, len(cache))
+
+    def test_counters_of_exited_threads_are_folded(self):
+        cache = DerivedKeyCache()
+        key = cache.cache_key('pwd', b'salt', 1)
+        cache.put(key, (b'key', b'iv'))
+
+        for _ in range(50):
+            thread = threading.Thread(target=lambda: (cache.get(key), cache.get(b'missing')))
+            thread.start()
+            thread.join()
+
+        self.assertEqual((50, 50), (cache.hits, cache.misses))
+        self.assertLessEqual(len(cache._counters), 1, 'expect no counter kept per exited thread')
+
+    def test_invalid_size(self):
+        with self.assertRaises(ArgumentError):
+            DerivedKeyCache(max_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from jasypt4py.calibration import Calibration, CalibrationCache
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.exceptions import ArgumentError
+from jasypt4py.generator import PKCS12ParameterGenerator
+
+
+class TestCalibration(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = CalibrationCache(os.path.join(self.directory, 'nested', 'calibration.json'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_iterations_for_budget(self):
+        calibration = Calibration(1e-6, 1e-4, 1000, time.time())
+
+        self.assertEqual(9901, calibration.iterations_for(0.01))
+        self.assertAlmostEqual(0.01, calibration.duration(9901))
+        self.assertEqual(1, calibration.iterations_for(1e-5))
+        with self.assertRaises(ArgumentError):
+            calibration.iterations_for(0)
+
+    def test_calibration_is_cached(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+
+        calibration = jasypt.calibrate(0.01, self.cache)
+        self.assertGreater(calibration.seconds_per_iteration, 0)
+        self.assertGreater(calibration.fixed_seconds, 0)
+        self.assertEqual(calibration, jasypt.calibrate(0.01, self.cache))
+
+        # other algorithms and expired entries are measured again
+        self.assertNotEqual(calibration, StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256').calibrate(
+            0.01, self.cache))
+        self.cache.max_age = -1
+        self.assertNotEqual(calibration, jasypt.calibrate(0.01, self.cache))
+
+    def test_malformed_entries_are_measured_again(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        jasypt.calibrate(0.01, self.cache)
+        key, = self.cache._read()
+
+        for entry in (None, 'garbage', {'created': time.time()}, dict(self.cache._read()[key], created='yesterday'),
+                      dict(self.cache._read()[key], seconds_per_iteration=0), dict(self.cache._read()[key], extra=1)):
+            with open(self.cache.path, 'w') as f:
+                json.dump({key: entry}, f)
+            self.assertIsNone(self.cache.get(key), 'expect %r to be a miss' % (entry,))
+
+        with open(self.cache.path, 'w') as f:
+            f.write('[]')
+        self.assertIsNone(self.cache.get(key))
+        self.assertGreater(jasypt.calibrate(0.01, self.cache).seconds_per_iteration, 0)
+
+    def test_recommend_iterations_does_not_write_by_default(self):
+        os.environ['JASYPT4PY_CALIBRATION_CACHE'] = self.cache.path
+        try:
+            self.assertGreater(PKCS12ParameterGenerator('sha256').recommend_iterations(0.01, min_time=0.01), 1)
+        finally:
+            del os.environ['JASYPT4PY_CALIBRATION_CACHE']
+
+        self.assertFalse(os.path.exists(self.cache.path))
+
+    def test_recommend_iterations(self):
+        generator = PKCS12ParameterGenerator('sha256')
+
+        iterations = generator.recommend_iterations(0.01, min_time=0.01, cache=self.cache)
+
+        self.assertGreater(iterations, 1)
+        self.assertLess(generator.recommend_iterations(0.001, cache=self.cache), iterations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from jasypt4py.cli import main
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name, content=None):
+        path = os.path.join(self.directory, name)
+        if content is not None:
+            with open(path, 'w') as f:
+                f.write(content)
+        return path
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read().splitlines()
+
+    def test_rotate(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        values = ['secret %d' % i for i in range(5)]
+        self.path('old.txt', '\n'.join(jasypt.encrypt('old', v, 10) for v in values) + '\n')
+
+        status = main(['rotate', '-i', self.path('old.txt'), '-o', self.path('new.txt'), '-p', 'old', '-n', '10',
+                       '--new-password', 'new', '--new-iterations', '20', '--new-algorithm',
+                       'PBEWITHSHA256AND128BITAES-CBC', '-w', '2', '--chunk-size', '2', '-q'])
+
+        self.assertEqual(0, status)
+        rotated = StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC')
+        self.assertEqual(values, [rotated.decrypt('new', v, 20) for v in self.read('new.txt')])
+
+    def test_rotate_to_authenticated(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256')
+        self.path('old.txt', jasypt.encrypt('pwd', 'secret', 10) + '\n')
+
+        self.assertEqual(0, main(['rotate', '-a', 'PBEWITHHMACSHA512ANDAES_256', '-i', self.path('old.txt'),
+                                  '-o', self.path('new.txt'), '-p', 'pwd', '--new-password', 'pwd', '-n', '10',
+                                  '--new-authenticated', '-w', '1', '-q']))
+
+        authenticated = StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256', authenticated=True)
+        self.assertEqual(['secret'], [authenticated.decrypt('pwd', v, 10) for v in self.read('new.txt')])
+
+    def test_encrypt_decrypt_with_errors(self):
+        self.path('plain.txt', 'a\nb\n')
+
+        self.assertEqual(0, main(['encrypt', '-i', self.path('plain.txt'), '-o', self.path('enc.txt'), '-p', 'pwd',
+                                  '-w', '1', '-q']))
+        self.path('enc.txt', '\n'.join(self.read('enc.txt') + ['not base64!']))
+        status = main(['decrypt', '-i', self.path('enc.txt'), '-o', self.path('dec.txt'), '-p', 'pwd', '-w', '1',
+                       '-q'])
+
+        self.assertEqual(1, status, 'expect a failed line to be reported in the exit status')
+        self.assertEqual(['a', 'b', 'not base64!'], self.read('dec.txt'))
+
+    def test_invalid_algorithm(self):
+        self.assertEqual(2, main(['decrypt', '-a', 'ROT13', '-p', 'pwd']))
+
+    def test_invalid_chunk_size(self):
+        for size in ('0', '-1'):
+            stderr, sys.stderr = sys.stderr, io.StringIO()
+            try:
+                with self.assertRaises(SystemExit) as context:
+                    main(['decrypt', '-p', 'pwd', '--chunk-size', size])
+                message = sys.stderr.getvalue()
+            finally:
+                sys.stderr = stderr
+
+            self.assertEqual(2, context.exception.code)
+            self.assertIn('argument --chunk-size: %s is not a positive integer' % size, message)
+
+    def test_calibrate(self):
+        os.environ['JASYPT4PY_CALIBRATION_CACHE'] = self.path('calibration.json')
+        try:
+            self.assertEqual(0, main(['calibrate', '-b', '0.01', '--min-time', '0.01', '-q']))
+            self.assertTrue(os.path.exists(self.path('calibration.json')))
+            self.assertEqual(2, main(['calibrate', '-b', '0']))
+        finally:
+            del os.environ['JASYPT4PY_CALIBRATION_CACHE']
+
+
+if __name__ == '__main__':
+    unittest.main()
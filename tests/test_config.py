@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from jasypt4py.config import ConfigResolver
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+PASSWORD = 'pssst...don\'t tell anyone'
+SECRET = 'ENC(MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=)'
+
+
+class TestConfigResolver(unittest.TestCase):
+    def setUp(self):
+        self.jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
+        self.resolver = ConfigResolver(self.jasypt, PASSWORD, 4000)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_load_properties(self):
+        path = self.write('application.properties', '\n'.join([
+            '# comment',
+            'db.password=%s' % SECRET,
+            'db.url : jdbc:postgresql://db/app?password=%s' % SECRET,
+            'db.user admin',
+            'multi.line=first \\',
+            '    second',
+        ]))
+
+        config = self.resolver.load(path)
+
+        self.assertEqual({
+            'db.password': 'secret value',
+            'db.url': 'jdbc:postgresql://db/app?password=secret value',
+            'db.user': 'admin',
+            'multi.line': 'first second',
+        }, config)
+
+    def test_properties_escapes(self):
+        path = self.write('application.properties', '\n'.join([
+            'url\\:path\\=key = a\\:b\\=c',
+            'with\\ space:\\  leading space',
+            'unicode=caf\\u00e9 \\t tab\\\\',
+            'list=one, \\',
+            '     two, \\',
+            '     # not a comment',
+            'password=%s' % SECRET,
+        ]))
+
+        config = self.resolver.load(path)
+
+        self.assertEqual({
+            'url:path=key': 'a:b=c',
+            'with space': '  leading space',
+            'unicode': u'caf\xe9 \t tab\\',
+            'list': 'one, two, # not a comment',
+            'password': 'secret value',
+        }, config)
+
+        with self.assertRaises(ValueError):
+            self.resolver.load(self.write('broken.properties', 'key=\\u00zz'))
+
+    def test_load_json_and_yaml(self):
+        document = {'db': {'password': SECRET, 'hosts': ['a', SECRET]}, 'port': 5432}
+        expected = {'db': {'password': 'secret value', 'hosts': ['a', 'secret value']}, 'port': 5432}
+
+        self.assertEqual(expected, self.resolver.load(self.write('config.json', json.dumps(document))))
+        if yaml is None:
+            self.skipTest('PyYAML is not installed')
+        self.assertEqual(expected, self.resolver.load(self.write('config.yml', 'db:\n  password: %s\n  hosts:\n'
+                                                                               '    - a\n    - %s\nport: 5432\n'
+                                                                 % (SECRET, SECRET))))
+
+    def test_load_dotenv(self):
+        path = self.write('.env', 'export DB_PASSWORD="%s"\nDB_USER=admin\n' % SECRET)
+
+        self.assertEqual({'DB_PASSWORD': 'secret value', 'DB_USER': 'admin'}, self.resolver.load(path))
+
+    def test_duplicates_decrypted_once(self):
+        calls = []
+        decrypt_many = self.jasypt.decrypt_many
+        self.jasypt.decrypt_many = lambda p, values, *args, **kwargs: calls.append(values) or decrypt_many(
+            p, values, *args, **kwargs)
+
+        self.resolver.resolve({'a': SECRET, 'b': SECRET, 'c': [SECRET]})
+
+        self.assertEqual([['MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=']], calls)
+
+    def test_lazy_load(self):
+        path = self.write('application.properties', 'a=%s\nb=plain\n' % SECRET)
+
+        config = self.resolver.load(path, lazy=True)
+
+        self.assertEqual('plain', config['b'])
+        self.assertEqual({}, self.resolver._plain, 'expect nothing decrypted before access')
+        self.assertEqual('secret value', config['a'])
+        self.assertEqual(['a', 'b'], sorted(config))
+
+    def test_rewrite(self):
+        target = io.StringIO()
+
+        self.resolver.rewrite(io.StringIO(u'a: %s\nb: %s\n' % (SECRET, SECRET)), target, batch_lines=1)
+
+        self.assertEqual('a: secret value\nb: secret value\n', target.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
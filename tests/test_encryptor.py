@@ -1,6 +1,16 @@
+import hashlib
+import hmac
+import os
+import tracemalloc
 import unittest
+from base64 import b64decode
 
+from jasypt4py.backend import BACKENDS
 from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.exceptions import AuthenticationError
+from jasypt4py.metrics import MetricsCollector
+
+CIPHER_BACKENDS = [b.name for b in BACKENDS if b.ciphers and b.available()]
 
 
 class TestStandardPBEStringEncryptor(unittest.TestCase):
@@ -53,6 +63,99 @@ class TestStandardPBEStringEncryptor(unittest.TestCase):
         # decrypt returns a byte array so need to compare apples with apples
         self.assertEqual(message, decrypted_message, 'expect same result from reverse function')
 
+    def test_encrypt_decrypt_with_bound_password(self):
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF')
+
+        with jasypt.bind('pssst...don\'t tell anyone') as bound:
+            self.assertEqual('MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', bound.encrypt('secret value', 4000),
+                             'expected fixed crypted result')
+            self.assertEqual('secret value', bound.decrypt('MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 4000))
+
+        with self.assertRaises(ValueError):
+            bound.decrypt('MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 4000)
+
+    def test_encrypt_decrypt_bytes(self):
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF')
+        pwd = 'pssst...don\'t tell anyone'
+        message = bytearray(b'secret value')
+
+        self.assertEqual(b'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=',
+                         jasypt.encrypt_bytes(pwd, message, 4000, encode=True), 'expected fixed crypted result')
+
+        encrypted = jasypt.encrypt_bytes(pwd, memoryview(message), 4000)
+        self.assertEqual(b'0123456789ABCDEF', encrypted[:16], 'expect raw salt + cipher text')
+        self.assertEqual(b'secret value', jasypt.decrypt_bytes(pwd, bytearray(encrypted), 4000))
+
+    def test_encrypt_decrypt_into(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC')
+        pwd = 'pssst...don\'t tell anyone'
+        message = b'0123456789ABCDEF' * 3
+
+        encrypted = bytearray(jasypt.encrypted_size(len(message)) + 4)
+        written = jasypt.encrypt_into(pwd, message, encrypted, 10)
+        self.assertEqual(16 + 64, written, 'expect a full padding block for block aligned input')
+
+        decrypted = bytearray(64)
+        size = jasypt.decrypt_into(pwd, memoryview(encrypted)[:written], decrypted, 10)
+        self.assertEqual(message, bytes(decrypted[:size]))
+
+        with self.assertRaises(ValueError):
+            jasypt.decrypt_into(pwd, memoryview(encrypted)[:written], bytearray(10), 10)
+
+    def test_into_writes_straight_to_the_buffer(self):
+        message = bytearray(os.urandom(1024 * 1024 + 5))
+        encrypted = bytearray(len(message) + 32)
+        decrypted = bytearray(len(message))
+        for backend in CIPHER_BACKENDS:
+            jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', backend=backend)
+
+            tracemalloc.start()
+            written = jasypt.encrypt_into('password', message, encrypted, 1)
+            size = jasypt.decrypt_into('password', memoryview(encrypted)[:written], decrypted, 1)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            self.assertEqual(message, decrypted[:size])
+            self.assertEqual(jasypt.decrypt_bytes('password', encrypted[:written], 1), message)
+            self.assertLess(peak, 64 * 1024, 'expect no copy of the payload with %s' % backend)
+
+    def test_encrypt_decrypt_pbkdf2(self):
+        pwd = 'pssst...don\'t tell anyone'
+        for algorithm in ('PBEWITHHMACSHA512ANDAES_256', 'PBEWITHHMACSHA256ANDAES_128'):
+            jasypt = StandardPBEStringEncryptor(algorithm)
+
+            encrypted_message = jasypt.encrypt(pwd, 'secret value', 10)
+            self.assertEqual(48, len(b64decode(encrypted_message)), 'expect salt + iv + one cipher block')
+            self.assertEqual('secret value', jasypt.decrypt(pwd, encrypted_message, 10))
+
+    def test_pbkdf2_fixed_cipher_texts(self):
+        # salt + iv + AES-CBC(PBKDF2WithHmacSHA*) in the layout Jasypt 1.9.3 writes with a RandomIvGenerator, computed
+        # independently with the cryptography package's PBKDF2HMAC and AES
+        vectors = {
+            'PBEWITHHMACSHA256ANDAES_256': 'MDEyMzQ1Njc4OUFCQ0RFRkZFRENCQTk4NzY1NDMyMTDGIKWUAFjGqzRGSH2vOUoP',
+            'PBEWITHHMACSHA1ANDAES_256': 'MDEyMzQ1Njc4OUFCQ0RFRkZFRENCQTk4NzY1NDMyMTBu00jg6WekffixV+HHVSJb',
+            'PBEWITHHMACSHA1ANDAES_128': 'MDEyMzQ1Njc4OUFCQ0RFRkZFRENCQTk4NzY1NDMyMTCefD0O+FroN7fpavBoWjth',
+        }
+        pwd = 'pssst...don\'t tell anyone'
+
+        for algorithm, expected in vectors.items():
+            jasypt = StandardPBEStringEncryptor(algorithm=algorithm,
+                                                salt_generator='Fixed',
+                                                salt='0123456789ABCDEF',
+                                                iv_generator='Fixed',
+                                                iv='FEDCBA9876543210')
+            self.assertEqual(expected, jasypt.encrypt(pwd, 'secret value', 1000), algorithm)
+            self.assertEqual('secret value', StandardPBEStringEncryptor(algorithm).decrypt(pwd, expected, 1000),
+                             algorithm)
+
+    def test_iv_generator_with_pkcs12_algorithm(self):
+        with self.assertRaises(NotImplementedError):
+            StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', iv_generator='Random')
+
     def test_encrypt_decrypt_large_key(self):
         jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC')
         pwd = 'CAX6MDwO+QwgPeGRTEjM+84LWWTfQ1icE3wj8IIc8nUAx1I2+EmbUzy8ntCB0m21SWE0IMWSr/qvRDOP1EQua2rs2RHtsGGu/dxCJQ4ct4qlcQFTKNPbhpewoxbTmaBbbrIXIny4dZzYWXte0kNS4FscUrZX1RSNGq2qoaw4MPuVSRi0WtNmtd5ZJ5HVUQohkApiecZe0TJvBppXePFEobuts+NYtpdf0vWLJtWWr3e03qP3AYelNN2GcHDZdtMaEXNT0wbBClbULDaYOC4vCmyfzbHZan6SFFX8bHvtsS1tBuCcxXzfQwUkAKJQYgNrNdOW3xyM6mVAWT4AOjtVjO3PdrmRacML3KSYv+BRktKJRgmQWF5Msg=='
@@ -81,6 +184,70 @@ class TestStandardPBEStringEncryptor(unittest.TestCase):
 
         self.assertEqual(message, decrypted_message, 'expect same result from reverse function')
 
+    def test_authenticated_round_trip(self):
+        for algorithm in ('PBEWITHSHA256AND256BITAES-CBC', 'PBEWITHHMACSHA512ANDAES_256', 'PBEWITHHMACSHA1ANDAES_128'):
+            jasypt = StandardPBEStringEncryptor(algorithm, authenticated=True)
+            encrypted = jasypt.encrypt('password', 'secret value', 10)
+
+            self.assertEqual('secret value', jasypt.decrypt('password', encrypted, 10))
+            self.assertEqual(jasypt.encrypted_size(12), len(b64decode(encrypted)))
+
+    def test_authenticated_format(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', salt_generator='Fixed',
+                                            salt='0123456789ABCDEF', authenticated=True)
+        generator = jasypt.key_generator
+        password = generator.pkcs12_password_to_bytes('password')
+
+        encrypted = b64decode(jasypt.encrypt('password', 'secret value', 10))
+
+        # salt + cipher text as without authentication, followed by HMAC-SHA256 keyed with the PKCS12 mac material
+        self.assertEqual(b64decode(StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', salt_generator='Fixed',
+                                                              salt='0123456789ABCDEF').encrypt('password',
+                                                                                               'secret value', 10)),
+                         encrypted[:-32])
+        mac_key = generator.generate_derived_key(password, b'0123456789ABCDEF', 10, generator.MAC_MATERIAL, 32)
+        self.assertEqual(hmac.new(mac_key, encrypted[:-32], hashlib.sha256).digest(), encrypted[-32:])
+
+    def test_authenticated_rejects_modified_data(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256', authenticated=True)
+        encrypted = bytearray(jasypt.encrypt_bytes('password', b'secret value', 10))
+
+        with self.assertRaises(AuthenticationError):
+            jasypt.decrypt_bytes('wrong password', encrypted, 10)
+        for position in (0, 20, 40, len(encrypted) - 1):
+            modified = bytearray(encrypted)
+            modified[position] ^= 1
+            with self.assertRaises(AuthenticationError):
+                jasypt.decrypt_bytes('password', modified, 10)
+        with self.assertRaises(AuthenticationError):
+            jasypt.decrypt_bytes('password', encrypted[:40], 10)
+
+        # unauthenticated values are not accepted either
+        with self.assertRaises(AuthenticationError):
+            jasypt.decrypt('password', StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256').encrypt(
+                'password', 'secret value', 10), 10)
+
+    def test_authenticated_pbkdf2_format(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHHMACSHA1ANDAES_256', authenticated=True)
+        encrypted = jasypt.encrypt_bytes('password', b'secret value', 10)
+
+        # the mac key is expanded from the PBKDF2 key, not further PBKDF2 output
+        key = hashlib.pbkdf2_hmac('sha1', b'password', encrypted[:16], 10, 32)
+        mac_key = hmac.new(key, b'jasypt4py mac key\x01', hashlib.sha256).digest()
+        self.assertEqual(hmac.new(mac_key, encrypted[:-32], hashlib.sha256).digest(), encrypted[-32:])
+
+    def test_authenticated_rejects_before_key_derivation(self):
+        metrics = MetricsCollector()
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', authenticated=True, observer=metrics)
+        encrypted = bytearray(jasypt.encrypt_bytes('password', b'secret value', 10))
+        encrypted[20] ^= 1
+        metrics.reset()
+
+        with self.assertRaises(AuthenticationError):
+            jasypt.decrypt_bytes('password', encrypted, 10)
+
+        self.assertEqual(['mac_derivation'], list(metrics.as_dict()['phases']))
+
 
 if __name__ == '__main__':
     unittest.main()
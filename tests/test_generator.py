@@ -0,0 +1,121 @@
+import os
+import threading
+import unittest
+
+from Crypto.Hash import SHA256
+
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.generator import BufferedRandomSaltGenerator, PKCS12ParameterGenerator, PreparedPassword
+
+
+class TestPKCS12ParameterGenerator(unittest.TestCase):
+    def test_fast_path_matches_reference(self):
+        generator = PKCS12ParameterGenerator(SHA256)
+        password = PKCS12ParameterGenerator.pkcs12_password_to_bytes('pssst...don\'t tell anyone')
+
+        for salt_size in (0, 8, 16, 65):
+            salt = bytearray(os.urandom(salt_size))
+            for iterations in (1, 2, 17):
+                for key_size in (16, 32, 48, 100):
+                    self.assertEqual(
+                        generator.generate_derived_key_reference(password, salt, iterations,
+                                                                 generator.KEY_MATERIAL, key_size),
+                        generator.generate_derived_key(password, salt, iterations, generator.KEY_MATERIAL, key_size),
+                        'expect byte identical key for salt %d, iterations %d, key %d' % (
+                            salt_size, iterations, key_size))
+
+    def test_digest_factory_fallback_matches_reference(self):
+        generator = PKCS12ParameterGenerator(SHA256)
+        generator._hash_new = SHA256.new
+        password = PKCS12ParameterGenerator.pkcs12_password_to_bytes('password')
+        salt = bytearray(b'0123456789ABCDEF')
+
+        self.assertEqual(generator.generate_derived_key_reference(password, salt, 100, generator.IV_MATERIAL, 64),
+                         generator.generate_derived_key(password, salt, 100, generator.IV_MATERIAL, 64))
+
+    def test_derived_material_matches_single_keys(self):
+        generator = PKCS12ParameterGenerator(SHA256)
+        password = PKCS12ParameterGenerator.pkcs12_password_to_bytes('password')
+        salt = bytearray(b'0123456789ABCDEF')
+
+        key, iv, mac = generator.generate_derived_material(password, salt, 50, ((generator.KEY_MATERIAL, 32),
+                                                                                (generator.IV_MATERIAL, 16),
+                                                                                (generator.MAC_MATERIAL, 32)))
+
+        self.assertEqual(generator.generate_derived_key_reference(password, salt, 50, generator.KEY_MATERIAL, 32), key)
+        self.assertEqual(generator.generate_derived_key_reference(password, salt, 50, generator.IV_MATERIAL, 16), iv)
+        self.assertEqual(generator.generate_derived_key_reference(password, salt, 50, generator.MAC_MATERIAL, 32), mac)
+        self.assertEqual((key, iv), generator.generate_derived_parameters('password', salt, 50))
+
+    def test_prepared_password(self):
+        generator = PKCS12ParameterGenerator(SHA256)
+        salt = bytearray(b'0123456789ABCDEF')
+        prepared = PreparedPassword('password')
+        block = prepared.padded(64)
+
+        self.assertEqual(generator.generate_derived_parameters('password', salt, 20),
+                         generator.generate_derived_parameters(prepared, salt, 20))
+
+        prepared.close()
+
+        self.assertTrue(prepared.closed)
+        self.assertEqual(bytearray(64), block, 'expect the padded password to be zeroed')
+        with self.assertRaises(ValueError):
+            generator.generate_derived_parameters(prepared, salt, 20)
+
+    def test_adjust_blocks_matches_adjust(self):
+        i_block = bytearray(b'\xff' * 64 + os.urandom(64))
+        b = bytearray(b'\xff' * 32 + os.urandom(32))
+
+        adjusted = PKCS12ParameterGenerator.adjust_blocks(bytes(i_block), bytes(b), 64)
+        for j in range(0, len(i_block) // 64):
+            PKCS12ParameterGenerator.adjust(i_block, j * 64, b)
+
+        self.assertEqual(bytes(i_block), adjusted)
+
+
+class TestBufferedRandomSaltGenerator(unittest.TestCase):
+    def test_unique_salts_across_threads(self):
+        generator = BufferedRandomSaltGenerator(buffer_size=100)
+        salts = []
+
+        def generate():
+            for _ in range(500):
+                salts.append(bytes(generator.generate_salt()))
+
+        threads = [threading.Thread(target=generate) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(2000, len(set(salts)), 'expect no salt to be handed out twice')
+        self.assertTrue(all(len(salt) == 16 for salt in salts))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_fork_reseeds(self):
+        generator = BufferedRandomSaltGenerator()
+        generator.generate_salt()
+        read_fd, write_fd = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_fd, bytes(generator.generate_salt()))
+            os._exit(0)
+        os.waitpid(pid, 0)
+        child_salt = os.read(read_fd, 16)
+        os.close(read_fd)
+        os.close(write_fd)
+
+        self.assertNotEqual(bytes(generator.generate_salt()), child_salt, 'expect the child to refill its buffer')
+
+    def test_selectable_by_name(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', salt_generator='Buffered',
+                                            buffer_size=1024)
+
+        self.assertIsInstance(jasypt.salt_generator, BufferedRandomSaltGenerator)
+        self.assertEqual('secret value', jasypt.decrypt('pwd', jasypt.encrypt('pwd', 'secret value', 10), 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# seconds a bare import of the package may take, generous to stay reliable on slow CI machines
+IMPORT_BUDGET = 0.05
+
+# modules that must only load on first use
+LAZY_MODULES = ('Crypto', 'cryptography', 'multiprocessing', 'yaml', 'mmap', 'json')
+
+PROBE = '''
+import sys, time
+started = time.perf_counter()
+exec(sys.argv[1])
+print(time.perf_counter() - started)
+print(' '.join(m for m in sys.modules if m.split('.')[0] in sys.argv[2].split()))
+'''
+
+
+def run_probe(statement):
+    output = subprocess.check_output([sys.executable, '-c', PROBE, statement, ' '.join(LAZY_MODULES)],
+                                     env=dict(os.environ, PYTHONPATH=ROOT), cwd=ROOT).decode('utf-8').splitlines()
+    return float(output[0]), output[1].split() if len(output) > 1 else []
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'lazy imports require module __getattr__')
+class TestImport(unittest.TestCase):
+    def test_import_budget(self):
+        elapsed = min(run_probe('import jasypt4py')[0] for _ in range(3))
+
+        self.assertLess(elapsed, IMPORT_BUDGET, 'import jasypt4py took %.1f ms' % (elapsed * 1000))
+
+    def test_import_is_lazy(self):
+        self.assertEqual([], run_probe('import jasypt4py')[1])
+        self.assertEqual([], run_probe('from jasypt4py import StandardPBEStringEncryptor')[1])
+
+    def test_exports(self):
+        import jasypt4py
+
+        for name in jasypt4py.__all__:
+            self.assertIs(getattr(jasypt4py, name), getattr(sys.modules[jasypt4py._EXPORTS[name]], name))
+            self.assertIn(name, dir(jasypt4py))
+        with self.assertRaises(AttributeError):
+            getattr(jasypt4py, 'missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
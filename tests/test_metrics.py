@@ -0,0 +1,49 @@
+import unittest
+
+from jasypt4py.cache import DerivedKeyCache
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.metrics import MetricsCollector
+
+
+class TestMetricsCollector(unittest.TestCase):
+    def test_phases_recorded(self):
+        metrics = MetricsCollector()
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', observer=metrics)
+
+        jasypt.decrypt('pwd', jasypt.encrypt('pwd', 'secret value', 10), 10)
+
+        result = metrics.as_dict()
+        self.assertEqual({'salt_generation': 1, 'key_derivation': 2, 'iv_derivation': 2, 'cipher': 2, 'encoding': 2},
+                         dict((phase, stats['count']) for phase, stats in result['phases'].items()))
+        self.assertEqual({10: 2}, result['iterations'])
+        self.assertEqual(2, result['phases']['cipher']['histogram'][-1][1], 'expect a cumulative histogram')
+
+    def test_cache_hit_rate_and_prometheus_export(self):
+        metrics = MetricsCollector()
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF',
+                                            key_cache=DerivedKeyCache(),
+                                            observer=metrics)
+
+        for _ in range(4):
+            jasypt.decrypt('pssst...don\'t tell anyone', 'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 4000)
+
+        self.assertEqual(0.75, metrics.cache_hit_rate)
+        exported = metrics.to_prometheus()
+        self.assertIn('jasypt4py_phase_seconds_count{phase="key_derivation"} 1\n', exported)
+        self.assertIn('jasypt4py_phase_seconds_bucket{phase="cipher",le="+Inf"} 4\n', exported)
+        self.assertIn('jasypt4py_derivations_total{iterations="4000"} 1\n', exported)
+        self.assertIn('jasypt4py_cache_lookups_total{result="hit"} 3\n', exported)
+
+    def test_pbkdf2_key_derivation_recorded(self):
+        metrics = MetricsCollector()
+        jasypt = StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256', observer=metrics)
+
+        jasypt.encrypt('pwd', 'secret value', 10)
+
+        self.assertEqual(1, metrics.as_dict()['phases']['key_derivation']['count'])
+
+
+if __name__ == '__main__':
+    unittest.main()
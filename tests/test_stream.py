@@ -0,0 +1,63 @@
+import io
+import os
+import unittest
+
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.stream import PBEStreamEncryptor
+
+
+class TestPBEStreamEncryptor(unittest.TestCase):
+    def test_wire_compatible_with_string_encryptor(self):
+        jasypt = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                            salt_generator='Fixed',
+                                            salt='0123456789ABCDEF')
+        streamer = PBEStreamEncryptor(jasypt, chunk_size=16)
+        pwd = 'pssst...don\'t tell anyone'
+
+        target = io.BytesIO()
+        streamer.encrypt(pwd, io.BytesIO(b'secret value'), target, 4000, base64_output=True)
+        self.assertEqual(b'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', target.getvalue())
+
+        plain = io.BytesIO()
+        streamer.decrypt(pwd, io.BytesIO(b'MDEyMzQ1Njc4OUFCQ0RF\nRpK/4i3JBHsMTN1Zf2OCZ0o=\n'), plain, 4000,
+                         base64_input=True)
+        self.assertEqual(b'secret value', plain.getvalue())
+
+    def test_stream_round_trip(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND128BITAES-CBC')
+        pwd = 'pssst...don\'t tell anyone'
+
+        for size in (0, 15, 16, 17, 100000):
+            message = os.urandom(size)
+            for base64 in (False, True):
+                streamer = PBEStreamEncryptor(jasypt, chunk_size=1000)
+                encrypted = io.BytesIO()
+                streamer.encrypt(pwd, io.BytesIO(message), encrypted, 10, base64_output=base64)
+                decrypted = io.BytesIO()
+                streamer.decrypt(pwd, io.BytesIO(encrypted.getvalue()), decrypted, 10, base64_input=base64)
+
+                self.assertEqual(message, decrypted.getvalue(), 'expect round trip of %d bytes' % size)
+
+    def test_stream_with_plain_iv(self):
+        jasypt = StandardPBEStringEncryptor('PBEWITHHMACSHA512ANDAES_256')
+        streamer = PBEStreamEncryptor(jasypt, chunk_size=32)
+        encrypted = jasypt.encrypt('pwd', 'secret value' * 10, 10)
+
+        decrypted = io.BytesIO()
+        streamer.decrypt('pwd', io.BytesIO(encrypted.encode('ascii')), decrypted, 10, base64_input=True)
+
+        self.assertEqual(b'secret value' * 10, decrypted.getvalue())
+
+    def test_truncated_cipher_text(self):
+        streamer = PBEStreamEncryptor(StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC'))
+
+        with self.assertRaises(ValueError):
+            streamer.decrypt('pwd', io.BytesIO(b'0123456789ABCDEF0123'), io.BytesIO(), 10)
+
+    def test_authenticated_not_supported(self):
+        with self.assertRaises(NotImplementedError):
+            PBEStreamEncryptor(StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', authenticated=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import threading
+import unittest
+
+from jasypt4py.cache import DerivedKeyCache
+from jasypt4py.encryptor import StandardPBEStringEncryptor
+from jasypt4py.metrics import MetricsCollector
+
+
+class TestSharedEncryptor(unittest.TestCase):
+    def test_concurrent_encrypt_decrypt(self):
+        metrics = MetricsCollector()
+        cache = DerivedKeyCache(max_size=16)
+        jasypt = StandardPBEStringEncryptor('PBEWITHSHA256AND256BITAES-CBC', salt_generator='Buffered',
+                                            key_cache=cache, observer=metrics)
+        fixed = StandardPBEStringEncryptor(algorithm='PBEWITHSHA256AND256BITAES-CBC',
+                                           salt_generator='Fixed',
+                                           salt='0123456789ABCDEF',
+                                           key_cache=cache)
+        failures = []
+
+        def work(n):
+            try:
+                with jasypt.bind('password %d' % (n % 3)) as bound:
+                    for i in range(25):
+                        message = 'secret %d/%d' % (n, i)
+                        if bound.decrypt(bound.encrypt(message, 10), 10) != message:
+                            failures.append(message)
+                        if fixed.decrypt('pssst...don\'t tell anyone',
+                                         'MDEyMzQ1Njc4OUFCQ0RFRpK/4i3JBHsMTN1Zf2OCZ0o=', 4000) != 'secret value':
+                            failures.append('fixed')
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual([], failures)
+        self.assertEqual(8 * 25 * 3, cache.hits + cache.misses, 'expect every lookup to be counted')
+        self.assertLessEqual(len(cache), 16)
+        self.assertEqual(8 * 25 * 2, metrics.as_dict()['phases']['cipher']['count'])
+
+
+if __name__ == '__main__':
+    unittest.main()